@@ -0,0 +1,127 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Compares the vectorized pixel detection to stitchtoon on synthetic strips
+
+Every strip is detected with the detection params of every default profile
+and a few split heights. Cut points must be the same, exits with 1 otherwise.
+
+    python benchmarks/bench_detection.py --strips 3 --height 50000
+"""
+
+import argparse
+import json
+import os.path as osp
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, osp.dirname(osp.abspath(__file__)))
+
+from synthetic import make_strip
+
+from PIL import Image as pilImage
+from stitchtoon_gui.utils.constants import DEFAULT_PROFILES
+from stitchtoon_gui.utils.constants import VECTORIZED_DETECTION
+from stitchtoon_gui.utils.detection import select_detector
+from stitchtoon_gui.utils.params import make_stitch_params
+
+
+SPLIT_HEIGHTS = (1000, 4608, 50_000)
+
+
+def make_combined(width: int, height: int, seed: int):
+    """Combines synthetic pages into one strip like `ImageManipulator.combine`"""
+
+    from stitchtoon.services.image_directory import Image
+
+    rng = random.Random(seed)
+    strip = pilImage.new("RGBA", (width, height))
+    offset = 0
+    while offset < height:
+        strip.paste(make_strip(width, 2000, rng), (0, offset))
+        offset += 2000
+    return Image(path="", name=f"strip-{seed}", pil=strip)
+
+
+def detect(detection_type: str, strip, kwargs: dict[str, any]):
+    started = time.perf_counter()
+    points = select_detector(detection_type).run(combined_img=strip, **kwargs)
+    return points, time.perf_counter() - started
+
+
+def main():
+    from stitchtoon.utils.constants import DETECTION_TYPE
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strips", type=int, default=3)
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", default="-", help="Results JSON file, `-` for stdout"
+    )
+    args = parser.parse_args()
+
+    cases = {}
+    for profile in DEFAULT_PROFILES.values():
+        params = make_stitch_params(profile)
+        for split_height in SPLIT_HEIGHTS:
+            kwargs = {
+                "split_height": split_height,
+                "sensitivity": params["sensitivity"],
+                "scan_step": params["line_steps"],
+                "ignorable_pixels": params["ignorable_pixels"],
+            }
+            cases[json.dumps(kwargs, sort_keys=True)] = kwargs
+
+    results = []
+    mismatches = 0
+    for seed in range(args.seed, args.seed + args.strips):
+        strip = make_combined(args.width, args.height, seed)
+        for kwargs in cases.values():
+            expected, reference = detect(
+                DETECTION_TYPE.PIXEL_COMPARISON.value, strip, kwargs
+            )
+            points, vectorized = detect(VECTORIZED_DETECTION, strip, kwargs)
+            mismatches += points != expected
+            results.append(
+                {
+                    "seed": seed,
+                    "kwargs": kwargs,
+                    "same_points": points == expected,
+                    "reference_time": reference,
+                    "vectorized_time": vectorized,
+                }
+            )
+        strip.pil.close()
+
+    speedups = [
+        result["reference_time"] / max(result["vectorized_time"], 1e-6)
+        for result in results
+    ]
+    report = {
+        "params": vars(args),
+        "cases": len(results),
+        "mismatches": mismatches,
+        "median_speedup": statistics.median(speedups),
+        "min_speedup": min(speedups),
+        "results": results,
+    }
+    print(
+        f"{len(results)} cases, {mismatches} mismatches, "
+        f"median speedup {report['median_speedup']:.1f}x, "
+        f"min {report['min_speedup']:.1f}x",
+        file=sys.stderr,
+    )
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Benchmarks the default profiles with the exact kwargs the GUI builds
+
+Every run happens in a fresh process so peak RSS belongs to that run only.
+
+    python benchmarks/bench_profiles.py --count 40 --output results.json
+"""
+
+import argparse
+import json
+import os
+import os.path as osp
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, osp.dirname(osp.abspath(__file__)))
+
+from synthetic import generate
+
+from stitchtoon_gui import __version__
+from stitchtoon_gui.utils.constants import DEFAULT_PROFILES
+from stitchtoon_gui.utils.params import make_process_kwargs
+
+
+# Profiles matching source need the metadata written by another profile run
+INPUT_FROM = {
+    "Manga Ready": "Manga To Edit",
+}
+
+
+def peak_rss() -> int:
+    """Returns this process peak resident set size in bytes, 0 if unknown"""
+
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+
+            return psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            return 0
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def output_size(path: str) -> tuple[int, int]:
+    files = size = 0
+    for root, dirs, names in os.walk(path):
+        for name in names:
+            files += 1
+            size += osp.getsize(osp.join(root, name))
+    return files, size
+
+
+def run_case(profile: dict[str, any], input: str, output: str) -> dict[str, any]:
+    """Runs one profile, meant to be the only task of its process"""
+
+    from stitchtoon import process
+
+    from stitchtoon_gui.utils.stats import StatsProgress
+
+    progress = StatsProgress()
+    kwargs = make_process_kwargs(profile, input, output, progress)
+    started = time.perf_counter()
+    process(**kwargs)
+    wall_time = time.perf_counter() - started
+    files, size = output_size(output)
+    return {
+        "wall_time": wall_time,
+        "peak_rss": peak_rss(),
+        "output_files": files,
+        "output_bytes": size,
+        "stages": progress.stats.finish()["stages"],
+    }
+
+
+def bench_profile(name, profile, input, workdir, repeat) -> dict[str, any]:
+    runs = []
+    error = ""
+    for idx in range(repeat):
+        output = osp.join(workdir, name.replace(" ", "_"), str(idx))
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            try:
+                future = executor.submit(run_case, profile, input, output)
+                runs.append(future.result())
+            except Exception as e:
+                error = str(e)
+                break
+
+    result = {"profile": name, "input": input, "runs": runs, "error": error}
+    if runs:
+        result["wall_time"] = statistics.median(run["wall_time"] for run in runs)
+        result["peak_rss"] = max(run["peak_rss"] for run in runs)
+        result["output_bytes"] = runs[-1]["output_bytes"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20, help="Images per chapter")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--format", default="png", help="Source images format")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=list(DEFAULT_PROFILES.keys()),
+        help="Profile to run, may be repeated, Defaults to all default profiles",
+    )
+    parser.add_argument(
+        "--workdir", help="Keeps inputs and outputs in this directory"
+    )
+    parser.add_argument(
+        "--output", default="-", help="Results JSON file, `-` for stdout"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        source = osp.join(workdir, "source")
+        generate(source, args.count, args.width, args.height, args.format, args.seed)
+
+        results = []
+        outputs = {}
+        for name in args.profile or DEFAULT_PROFILES.keys():
+            input = source
+            if name in INPUT_FROM:
+                input = outputs.get(INPUT_FROM[name]) or source
+            result = bench_profile(
+                name, DEFAULT_PROFILES[name], input, workdir, args.repeat
+            )
+            if result["runs"]:
+                outputs[name] = osp.join(workdir, name.replace(" ", "_"), "0")
+            results.append(result)
+            print(
+                f"{name}: {result.get('wall_time', 0):.2f}s "
+                f"{result.get('peak_rss', 0) / 1024 / 1024:.0f}MB {result['error']}",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "stitchtoon_gui": __version__,
+            "stitchtoon": _stitchtoon_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {
+                "count": args.count,
+                "width": args.width,
+                "height": args.height,
+                "format": args.format,
+                "seed": args.seed,
+                "repeat": args.repeat,
+            },
+        },
+        "results": results,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+
+
+def _stitchtoon_version() -> str:
+    import stitchtoon
+
+    return stitchtoon.__version__
+
+
+if __name__ == "__main__":
+    main()
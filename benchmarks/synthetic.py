@@ -0,0 +1,59 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Synthetic webtoon raws, reproducible for a given seed"""
+
+import os
+import os.path as osp
+import random
+
+from PIL import Image
+from PIL import ImageDraw
+
+
+# Gap between panels, where pixel detection is expected to cut
+GUTTER = 120
+
+
+def make_strip(width: int, height: int, rng: random.Random) -> Image.Image:
+    """Draws a strip of panels with white gutters, speech bubbles and lines"""
+
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    top = rng.randint(0, GUTTER)
+    while top < height:
+        bottom = min(top + rng.randint(height // 4, height), height)
+        color = tuple(rng.randint(40, 220) for _ in range(3))
+        draw.rectangle((16, top, width - 16, bottom), fill=color, outline="black")
+        for _ in range(rng.randint(1, 4)):
+            x = rng.randint(16, width - 96)
+            y = rng.randint(top, max(top, bottom - 64))
+            draw.ellipse((x, y, x + 80, y + 48), fill="white", outline="black")
+            draw.line((x + 12, y + 24, x + 68, y + 24), fill="black", width=2)
+        top = bottom + GUTTER
+    return img
+
+
+def generate(
+    output: os.PathLike,
+    count: int = 20,
+    width: int = 800,
+    height: int = 2000,
+    format: str = "png",
+    seed: int = 0,
+) -> list[str]:
+    """Writes `count` strips to output and returns their paths"""
+
+    os.makedirs(output, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for idx in range(1, count + 1):
+        img = make_strip(width, height, rng)
+        path = osp.join(output, f"{idx:03}.{format}")
+        if format.lower() in ("psd", "psb"):
+            from psd_tools import PSDImage
+
+            PSDImage.frompil(img).save(path)
+        else:
+            img.save(path, format="jpeg" if format.lower() == "jpg" else format)
+        paths.append(path)
+    return paths
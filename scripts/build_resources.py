@@ -0,0 +1,80 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Compiles layout.ui into a python module and pre-renders every theme
+
+    python scripts/build_resources.py
+
+Both outputs are picked up at runtime when up to date, see `gui/prebuilt.py`.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from stitchtoon_gui.gui.prebuilt import BUNDLED_THEMES
+from stitchtoon_gui.gui.prebuilt import COMPILED_LAYOUT
+from stitchtoon_gui.gui.prebuilt import LAYOUT
+from stitchtoon_gui.gui.prebuilt import layout_hash
+from stitchtoon_gui.gui.prebuilt import render_theme
+from stitchtoon_gui.gui.prebuilt import themes_key
+from stitchtoon_gui.utils.constants import THEMES
+
+
+WRAPPER = '''
+
+LAYOUT_HASH = "{hash}"
+
+
+class MainWindowUi(QMainWindow, Ui_MainWindow):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setupUi(self)
+'''
+
+
+def compile_layout() -> None:
+    uic = shutil.which("pyside6-uic")
+    cmd = [uic] if uic else [sys.executable, "-m", "PySide6.scripts.pyside_tool", "uic"]
+    subprocess.run(cmd + [str(LAYOUT), "-o", str(COMPILED_LAYOUT)], check=True)
+    with open(COMPILED_LAYOUT, "a") as fd:
+        fd.write("from PySide6.QtWidgets import QMainWindow\n")
+        fd.write(WRAPPER.format(hash=layout_hash()))
+    print(f"{LAYOUT.name} -> {COMPILED_LAYOUT}")
+
+
+def render_themes() -> None:
+    from PySide6.QtWidgets import QApplication
+
+    key = themes_key()
+    if not key:
+        sys.exit("qt-material is not installed")
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    directory = BUNDLED_THEMES / key
+    shutil.rmtree(BUNDLED_THEMES, ignore_errors=True)
+    directory.mkdir(parents=True)
+    for theme in THEMES:
+        render_theme(theme, directory)
+        print(f"{theme} -> {directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--no-ui", action="store_true", help="Skips layout.ui")
+    parser.add_argument("--no-themes", action="store_true", help="Skips themes")
+    args = parser.parse_args()
+
+    if not args.no_ui:
+        compile_layout()
+    if not args.no_themes:
+        render_themes()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+from multiprocessing import freeze_support
+
 from stitchtoon_gui.__main__ import main
 
 
 if __name__ == "__main__":
+    # process pool workers re-run this script in frozen builds
+    freeze_support()
     main()
@@ -3,12 +3,16 @@
 """stitchtoon"""
 
 import os
+import sys
+from functools import lru_cache
 from sys import version_info
 
 
 # Version helper
+@lru_cache(maxsize=None)
 def version_helper():
-    if __release__:
+    # frozen builds ship without git
+    if __release__ or getattr(sys, "frozen", False):
         version_string = "stitchtoon-gui {0}".format(__version__)
     else:
         import subprocess
@@ -40,7 +44,13 @@ __email__ = "beshrghalil@porotonmail.com"
 stitchtoon_gui = os.path.dirname(__file__)
 DEFAULT_PAGER = "less"
 USAGE = "%prog [options] [path]"
-VERSION = version_helper()
 PY3 = version_info[0] >= 3
 
 args = None
+
+
+def __getattr__(name):
+    # VERSION spawns `git describe`, so it's resolved on first access only
+    if name == "VERSION":
+        return version_helper()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
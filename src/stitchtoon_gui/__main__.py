@@ -1,15 +1,25 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+import sys
+
+
+# checked before argparse runs, so the imports below are timed too
+if "--profile-startup" in sys.argv[1:]:
+    from .utils.startup_profile import ImportProfiler
+
+    profiler = ImportProfiler()
+    profiler.install()
+else:
+    profiler = None
+
 import argparse
 import gc
-import sys
 from pathlib import Path
 
 from . import __version__
-from .gui.mainwindow import MainWindow
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QApplication
+from .cli import add_run_parser
+from .cli import run
 
 
 def exit_handler(*to_exit):
@@ -29,8 +39,22 @@ def main():
     parser.add_argument(
         "--debug", action="store_true", help="Runs in debug mode", default=False
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Prints an import time breakdown of the startup",
+        default=False,
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    add_run_parser(subparsers)
     args = parser.parse_args()
 
+    global profiler
+    if profiler and not args.profile_startup:
+        # the flag was an argument value, like a path
+        profiler.uninstall()
+        profiler = None
+
     if args.reset:
         from .utils.settings import settings
 
@@ -49,6 +73,17 @@ def main():
             home = Path.home()
         Logger = get_logger(logging.DEBUG, str(home / "STITCHTOON_LOG.log"))
 
+    if args.command == "run":
+        return_code = run(args)
+        if profiler:
+            profiler.uninstall()
+            profiler.report()
+        sys.exit(return_code)
+
+    from .gui.mainwindow import MainWindow
+    from PySide6.QtCore import Qt
+    from PySide6.QtWidgets import QApplication
+
     QApplication.setDesktopSettingsAware(True)
     QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
@@ -57,6 +92,9 @@ def main():
     widget = MainWindow()
     app.aboutToQuit.connect(lambda: exit_handler(widget))
     widget.show()
+    if profiler:
+        profiler.uninstall()
+        profiler.report()
     return_code = app.exec()
     sys.exit(return_code)
 
@@ -0,0 +1,149 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Headless mode, stitches using a saved profile without building the UI"""
+
+import sys
+
+
+def add_run_parser(subparsers) -> None:
+    """Adds `run` sub command to an argparse subparsers object"""
+
+    parser = subparsers.add_parser(
+        "run", help="Stitches input to output using a profile without the GUI"
+    )
+    parser.add_argument("input", help="Input directory")
+    parser.add_argument("output", help="Output directory")
+    parser.add_argument(
+        "-p",
+        "--profile",
+        help="Profile name, Defaults to the last used profile",
+        default="",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Runs in batch mode whatever the profile says",
+        default=False,
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Stitches chapters again even when they are up to date",
+        default=False,
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        metavar="MB",
+        help="Stitches chapters with a bigger strip a few images at a time, "
+        "0 for unlimited, Defaults to the profile memory limit",
+        default=None,
+    )
+    parser.add_argument(
+        "--memory-map",
+        type=int,
+        metavar="MB",
+        help="Stitches chapters with a bigger strip into a temporary file, "
+        "0 for never, Defaults to the profile memory map threshold",
+        default=None,
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Stitches batch mode chapters on this many processes",
+        default=1,
+    )
+    parser.add_argument(
+        "--stats",
+        metavar="FILE",
+        help="Writes run timings and throughput as JSON, `-` for stdout",
+        default="",
+    )
+    parser.add_argument(
+        "--show-progress",
+        action="store_true",
+        help="Shows a progress bar",
+        default=False,
+    )
+
+
+def run(args) -> int:
+    """Runs `stitchtoon.process` kwargs of a saved profile"""
+
+    from .utils.cancellation import remove_new_outputs
+    from .utils.cancellation import snapshot_outputs
+    from .utils.params import make_process_kwargs
+    from .utils.settings import settings
+
+    if args.profile:
+        profile = settings.get_profiles().get(args.profile)
+        if not profile:
+            print(
+                f"ERROR: Unknown profile `{args.profile}`, available profiles: "
+                + ", ".join(settings.get_profiles().keys()),
+                file=sys.stderr,
+            )
+            return 2
+    else:
+        profile = settings.get_profile()
+
+    if args.batch:
+        profile = {**profile, "batchMode": True}
+    if args.memory_limit is not None:
+        profile = {**profile, "memoryLimit": args.memory_limit}
+    if args.memory_map is not None:
+        profile = {**profile, "memoryMap": args.memory_map}
+
+    progress = None
+    if args.show_progress:
+        from stitchtoon.services.progressbar import DefaultCliProgress
+
+        progress = DefaultCliProgress()
+    if args.stats:
+        from .utils.stats import StatsProgress
+
+        progress = StatsProgress(progress=progress)
+
+    kwargs = make_process_kwargs(profile, args.input, args.output, progress)
+    if args.force:
+        kwargs["skip_unchanged"] = False
+    snapshot = snapshot_outputs(args.output)
+    try:
+        if args.workers > 1 and kwargs["recursive"]:
+            from .utils.batch import process_parallel
+
+            process_parallel(kwargs, args.workers, progress=progress)
+        else:
+            from .utils.pipeline import run_pipeline
+
+            run_pipeline(kwargs)
+    except KeyboardInterrupt:
+        remove_new_outputs(args.output, snapshot)
+        print("Canceled", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    if args.stats:
+        write_stats(args, progress.stats, kwargs["recursive"], snapshot)
+
+    return 0
+
+
+def write_stats(args, stats, recursive: bool, snapshot: set[str]) -> None:
+    import json
+
+    from .utils.stats import files_size
+    from .utils.stats import images_size
+
+    record = stats.finish(
+        images_size(args.input, recursive), files_size(args.output, snapshot)
+    )
+    if args.stats == "-":
+        json.dump(record, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.stats, "w") as fd:
+            json.dump(record, fd, indent=2)
@@ -0,0 +1,85 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import os
+from collections import deque
+from threading import Lock
+
+from ..utils.constants import CONSOLE_LINES
+from ..utils.constants import CONSOLE_RATE
+from PySide6.QtCore import QObject
+from PySide6.QtCore import QTimer
+from PySide6.QtCore import Signal
+
+
+class ConsoleWorker(QObject):
+    """Post process output sink, `write` is safe to call from any thread
+
+    Lines are queued and emitted in batches `rate` times per second, runs of
+    lines of the same type joined into one chunk. At most `limit` lines wait
+    for the GUI, older ones are dropped from the console but every line is
+    written to the spool file.
+    """
+
+    linesReady = Signal(list)
+
+    def __init__(self, limit=CONSOLE_LINES, rate=CONSOLE_RATE, parent=None):
+        super().__init__(parent)
+        self.lines = deque(maxlen=limit)
+        self.dropped = 0
+        self.lock = Lock()
+        self.spool = None
+        self.spool_path = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(1000 / rate))
+        self.timer.timeout.connect(self.flush)
+
+    def open(self, path: os.PathLike) -> None:
+        """Starts delivering lines and spooling them to path"""
+
+        self.close()
+        with self.lock:
+            self.spool = open(path, "w", encoding="utf-8", errors="replace")
+            self.spool_path = path
+        self.timer.start()
+
+    def write(self, msg: str, type: str = "normal") -> None:
+        msg = msg.rstrip("\r\n")
+        with self.lock:
+            if len(self.lines) == self.lines.maxlen:
+                self.dropped += 1
+            self.lines.append((msg, type))
+            if self.spool:
+                self.spool.write(msg + "\n")
+
+    def flush(self) -> None:
+        """Emits pending lines"""
+
+        with self.lock:
+            lines = list(self.lines)
+            self.lines.clear()
+            dropped, self.dropped = self.dropped, 0
+        if not lines:
+            return
+
+        chunks = []
+        if dropped:
+            chunks.append(
+                ([f"... {dropped} lines skipped, see {self.spool_path}"], "warning")
+            )
+        for msg, type in lines:
+            if chunks and chunks[-1][1] == type:
+                chunks[-1][0].append(msg)
+            else:
+                chunks.append(([msg], type))
+        self.linesReady.emit([("\n".join(msgs), type) for msgs, type in chunks])
+
+    def close(self) -> None:
+        """Emits what is left and closes the spool file"""
+
+        self.timer.stop()
+        self.flush()
+        with self.lock:
+            if self.spool:
+                self.spool.close()
+                self.spool = None
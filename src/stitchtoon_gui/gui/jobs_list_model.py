@@ -0,0 +1,74 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+from ..utils.jobs import JOB_STATUS
+from ..utils.jobs import Job
+from PySide6.QtCore import QAbstractListModel
+from PySide6.QtCore import QModelIndex
+from PySide6.QtCore import Qt
+
+
+class JobsListModel(QAbstractListModel):
+    def __init__(self, jobs: list[Job] = None, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs if jobs is not None else []
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self.jobs)
+
+    def data(self, index, role):
+        row = index.row()
+        if not index.isValid() or row >= len(self.jobs):
+            return None
+        if role == Qt.DisplayRole:
+            return str(self.jobs[row])
+        elif role == Qt.ToolTipRole:
+            return self.jobs[row].output
+        elif role == Qt.UserRole:
+            return self.jobs[row]
+        else:
+            return None
+
+    def addJob(self, job: Job):
+        row = len(self.jobs)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.jobs.append(job)
+        self.endInsertRows()
+
+    def removeJob(self, index):
+        row = index.row()
+        if not index.isValid() or self.jobs[row].status == JOB_STATUS.RUNNING:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.jobs[row]
+        self.endRemoveRows()
+
+    def moveJob(self, index, step: int) -> bool:
+        """Moves a job up (negative step) or down (positive step) the queue"""
+
+        row = index.row()
+        new_row = row + step
+        if not index.isValid() or not 0 <= new_row < len(self.jobs):
+            return False
+        # destination row is the row the job is inserted before
+        destination = new_row + 1 if step > 0 else new_row
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+        self.jobs.insert(new_row, self.jobs.pop(row))
+        self.endMoveRows()
+        return True
+
+    def retryJob(self, index):
+        row = index.row()
+        if not index.isValid() or self.jobs[row].status != JOB_STATUS.FAILED:
+            return
+        self.jobs[row].status = JOB_STATUS.QUEUED
+        self.jobs[row].error = ""
+        self.dataChanged.emit(index, index)
+
+    def refreshJob(self, job: Job):
+        row = self.jobs.index(job)
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index)
+
+    def countJobs(self, status: JOB_STATUS) -> int:
+        return sum(1 for job in self.jobs if job.status == status)
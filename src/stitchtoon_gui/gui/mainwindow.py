@@ -3,51 +3,78 @@
 
 
 import os
+import os.path as osp
 import re
-import shlex
 from pathlib import Path
 
 from .. import __author__
 from .. import __license__
 from .. import __version__
-from ..threads.postprocess import PostProcessThread
-from ..threads.process import ProcessThread
+from ..threads.job_queue import JobQueue
 from ..threads.update_checker import UpdateCheckThread
+from ..utils.cancellation import CancellationToken
+from ..utils.constants import CONSOLE_LINES
+from ..utils.constants import DEFAULT_WORKERS
+from ..utils.constants import LOG_REL_DIR
+from ..utils.constants import POSTPROCESS_SCOPE
+from ..utils.constants import PREVIEW_DELAY
 from ..utils.constants import SOURCE_CODE_LINK
 from ..utils.constants import SPLIT_METHOD
 from ..utils.constants import SUPPORTS_LOSSY_QUALITY
 from ..utils.constants import THEMES
+from ..utils.constants import VECTORIZED_DETECTION
+from ..utils.constants import WORKER_TYPE
+from ..utils.jobs import JOB_STATUS
+from ..utils.jobs import Job
+from ..utils.params import make_process_kwargs
+from ..utils.postprocess import get_scope
+from ..utils.profile_store import read_profiles
+from ..utils.profile_store import write_profiles
 from ..utils.settings import Profile
+from ..utils.settings import data_dir
 from ..utils.settings import settings
+from ..utils.stats import format_live
+from ..utils.stats import format_record
+from ..utils.stats import format_seconds
+from .console_worker import ConsoleWorker
+from .jobs_list_model import JobsListModel
+from .prebuilt import apply_theme
+from .prebuilt import load_ui
+from .profiles_list_model import ProfilesFilterModel
 from .profiles_list_model import ProfilesListModel
 from .progressbar_worker import ProgressWorker
-from PySide6.QtCore import QFile
-from PySide6.QtCore import QIODevice
+from .slice_preview import SlicePreview
 from PySide6.QtCore import Qt
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QColor
 from PySide6.QtGui import QDesktopServices
-from PySide6.QtUiTools import QUiLoader
+from PySide6.QtGui import QTextCharFormat
+from PySide6.QtGui import QTextCursor
 from PySide6.QtWidgets import QFileDialog
 from PySide6.QtWidgets import QMessageBox
-from qt_material import QtStyleTools
-from qt_material import apply_stylesheet
-from stitchtoon.utils.constants import DETECTION_TYPE
-from stitchtoon.utils.constants import SMALLER_ALLOWED_HEIGHT
-from stitchtoon.utils.constants import SUPPORTED_IMG_TYPES
-from stitchtoon.utils.constants import WIDTH_ENFORCEMENT
 
 
 QTMATERIAL_PRIMARYTEXTCOLOR = os.environ.get("QTMATERIAL_PRIMARYTEXTCOLOR")
 QTMATERIAL_SECONDARYTEXTCOLOR = os.environ.get("QTMATERIAL_SECONDARYTEXTCOLOR")
-CUSTOM_CSS = Path(__file__).parent / "resources/custom.css"
-LAYOUT = Path(__file__).parent / "resources/layout.ui"
-STYLE_EXTRA = {}
 
 
-class MainWindow(QtStyleTools):
+class MainWindow:
     def __init__(self, parent=None):
         super().__init__()
         self.progress = ProgressWorker()
+        self.console = ConsoleWorker()
+        self.progress_text = ""
+        self.progress_figures = ""
         self.profilesModel = ProfilesListModel(settings.get_profiles())
+        self.profilesFilter = ProfilesFilterModel(self.profilesModel)
+        self.jobsModel = JobsListModel()
+        self.jobQueue = JobQueue(self.jobsModel.jobs)
+        self.thread = None
+        self.postprocess_thread = None
+        self.check_update_thread = None
+        self.preview_thread = None
+        self.preview_scale = 1.0
+        self.previewTimer = QTimer(singleShot=True, interval=PREVIEW_DELAY)
 
         self.ui = self.load_ui()
         self.configure_ui()
@@ -56,16 +83,15 @@ class MainWindow(QtStyleTools):
     def load_ui(self) -> None:
         """Loads UI File"""
 
-        loader = QUiLoader()
-        ui_file = QFile(LAYOUT)
-        ui_file.open(QIODevice.ReadOnly)
-        ui = loader.load(ui_file)
-        ui_file.close()
-        return ui
+        return load_ui()
 
     def configure_ui(self) -> None:
         """Sets Widgets values against saved settings"""
 
+        from stitchtoon.utils.constants import DETECTION_TYPE
+        from stitchtoon.utils.constants import SUPPORTED_IMG_TYPES
+        from stitchtoon.utils.constants import WIDTH_ENFORCEMENT
+
         # adds items to QComboBox from an iter
         def _set_combo_to_iter(combo, iter, *str_funcs):
             for i in iter:
@@ -108,9 +134,12 @@ class MainWindow(QtStyleTools):
         _set_combo_to_enum(
             self.ui.detectionType, DETECTION_TYPE, "value", str.capitalize
         )
+        self.ui.detectionType.addItem(VECTORIZED_DETECTION.capitalize())
+        _set_combo_to_enum(self.ui.workerType, WORKER_TYPE, "value", str.capitalize)
 
         self.ui.profile.setModel(self.profilesModel)
-        self.ui.settingsProfiles.setModel(self.profilesModel)
+        self.ui.settingsProfiles.setModel(self.profilesFilter)
+        self.ui.jobs.setModel(self.jobsModel)
 
         self.load_profile(settings.get_profile())
 
@@ -119,6 +148,20 @@ class MainWindow(QtStyleTools):
 
         # --- Post Process ---
         self.enable_postprocess(self.ui.enablePostProcess.isChecked())
+        self.ui.postProcessConsole.document().setMaximumBlockCount(CONSOLE_LINES)
+        self.ui.postProcessWorkers.setValue(
+            int(settings.get("postprocess-workers", DEFAULT_WORKERS))
+        )
+
+        # --- Queue ---
+        self.ui.workers.setValue(int(settings.get("workers", DEFAULT_WORKERS)))
+        self.ui.workerType.setCurrentText(
+            settings.get("worker-type", WORKER_TYPE.THREADS.value).capitalize()
+        )
+
+        # --- Advanced ---
+        self.slicePreview = SlicePreview()
+        self.ui.previewArea.setWidget(self.slicePreview)
 
         # --- Settings ---
         self.change_theme(settings["theme"])
@@ -132,10 +175,43 @@ class MainWindow(QtStyleTools):
         # links values between progress handler and ui progress bar widget
         self.progress.valueChanged.connect(self.ui.progressBar.setValue)
 
-        # links text between progress handler and ui progress bar widget
+        # links text and live figures between progress handler and ui
+        # progress bar widget
         self.progress.textChanged.connect(
-            lambda value: self.ui.progressBar.setFormat(f"{value} %p%")
+            lambda value: self.set_progress_format(text=value)
+        )
+        self.progress.statsChanged.connect(
+            lambda live: self.set_progress_format(figures=format_live(live))
+        )
+
+        # --- Queue tab ---
+
+        self.ui.addJob.clicked.connect(self.add_job)
+        self.ui.removeJob.clicked.connect(
+            lambda: self.jobsModel.removeJob(self.ui.jobs.currentIndex())
+        )
+        self.ui.moveJobUp.clicked.connect(lambda: self.move_job(-1))
+        self.ui.moveJobDown.clicked.connect(lambda: self.move_job(1))
+        self.ui.retryJob.clicked.connect(self.retry_job)
+        self.ui.startQueue.clicked.connect(self.start_queue)
+
+        self.ui.workers.valueChanged.connect(
+            lambda value: settings.setValue("workers", value)
         )
+        self.ui.workerType.currentTextChanged.connect(
+            lambda text: settings.setValue("worker-type", text.lower())
+        )
+
+        # keeps jobs list and queue progress bar up to date
+        self.jobQueue.jobChanged.connect(self.jobsModel.refreshJob)
+        self.jobQueue.jobChanged.connect(lambda job: self.update_queue_progress())
+        self.jobsModel.rowsInserted.connect(self.update_queue_progress)
+        self.jobsModel.rowsRemoved.connect(self.update_queue_progress)
+        self.jobsModel.dataChanged.connect(self.update_queue_progress)
+
+        self.jobQueue.started.connect(lambda: self.ui.startQueue.setText("Stop"))
+        self.jobQueue.finished.connect(lambda: self.ui.startQueue.setText("Start"))
+        self.jobQueue.finished.connect(self.queue_finished)
 
         # --- Settings tab ---
 
@@ -145,9 +221,7 @@ class MainWindow(QtStyleTools):
         self.ui.addProfile.clicked.connect(
             lambda: self.add_profile(
                 self.ui.profileName.text()
-                or self.profilesModel.data(
-                    self.ui.settingsProfiles.currentIndex(), Qt.DisplayRole
-                )
+                or self.profilesModel.data(self.selected_profile(), Qt.DisplayRole)
             )
         )
 
@@ -156,43 +230,26 @@ class MainWindow(QtStyleTools):
             lambda profile: self.load_profile(profile)
         )
 
-        # saves new profile to settings
-        self.profilesModel.profileAdded.connect(
-            lambda profile: settings.setValue(
-                "profiles", self.profilesModel.getProfiles()
-            )
-        )
-
-        # saves updated profile to settings
-        self.profilesModel.profileUpdated.connect(
-            lambda profile: settings.setValue(
-                "profiles", self.profilesModel.getProfiles()
-            )
-        )
-
-        # removes deleted profile from settings
-        self.profilesModel.profileDeleted.connect(
-            lambda: settings.setValue("profiles", self.profilesModel.getProfiles())
-        )
-
-        # removes deleted profile from profilesModel
+        # removes deleted profile from profilesModel, which saves it
         self.ui.deleteProfile.clicked.connect(
-            lambda: self.profilesModel.deleteProfile(
-                self.ui.settingsProfiles.currentIndex()
-            )
+            lambda: self.profilesModel.deleteProfile(self.selected_profile())
         )
 
         # sets ui widgets values against profile changing
         self.ui.settingsProfiles.clicked.connect(
-            lambda idx: self.load_profile(
-                settings.get_profile(self.profilesModel.data(idx, Qt.DisplayRole))
-            )
+            lambda idx: self.load_profile(settings.get_profile(idx.data()))
         )
 
         self.ui.settingsProfiles.activated.connect(
-            lambda idx: self.ui.profile.setCurrentIndex(idx.row())
+            lambda idx: self.ui.profile.setCurrentIndex(
+                self.profilesFilter.mapToSource(idx).row()
+            )
         )
 
+        self.ui.profilesFilter.textChanged.connect(self.profilesFilter.setSearch)
+        self.ui.importProfiles.clicked.connect(self.import_profiles)
+        self.ui.exportProfiles.clicked.connect(self.export_profiles)
+
         self.ui.resetSettings.clicked.connect(self.reset)
         self.ui.sourceLink.clicked.connect(
             lambda: QDesktopServices.openUrl(SOURCE_CODE_LINK)
@@ -210,6 +267,32 @@ class MainWindow(QtStyleTools):
             lambda enable: self.enable_postprocess(enable)
         )
 
+        self.ui.postProcessWorkers.valueChanged.connect(
+            lambda value: settings.setValue("postprocess-workers", value)
+        )
+
+        # appends post process output batches to the console
+        self.console.linesReady.connect(self.postprocess_console)
+
+        # --- Advanced tab ---
+
+        # previews slices once options settle, only while the tab is shown
+        for signal in (
+            self.ui.input.textChanged,
+            self.ui.batchMode.stateChanged,
+            self.ui.splitValue.valueChanged,
+            self.ui.splitMethod.currentTextChanged,
+            self.ui.widthEnforcement.currentTextChanged,
+            self.ui.widthEnforcementSpinBox.valueChanged,
+            self.ui.detectionType.currentTextChanged,
+            self.ui.sensitivity.valueChanged,
+            self.ui.lineSteps.valueChanged,
+            self.ui.ignorablePixels.valueChanged,
+            self.ui.Tabs.currentChanged,
+        ):
+            signal.connect(lambda *args: self.previewTimer.start())
+        self.previewTimer.timeout.connect(self.preview)
+
         # --- Stitch tab ---
 
         # changes visibility of lossy quality slider according to chosen format
@@ -255,7 +338,9 @@ class MainWindow(QtStyleTools):
         # disabled conflicted widgets
         self.ui.matchSource.stateChanged.connect(self.enable_match_source)
 
-        self.ui.start.clicked.connect(self.start)
+        self.ui.start.clicked.connect(
+            lambda: self.stop() if self.is_running() else self.start()
+        )
 
     def load_profile(self, profile: Profile) -> None:
         """Sets Widgets values according to a profile"""
@@ -264,6 +349,10 @@ class MainWindow(QtStyleTools):
         self.ui.detectionType.setCurrentText(profile["detectionType"])
         self.ui.enablePostProcess.setChecked(profile["enablePostProcess"])
         self.ui.exportArchive.setChecked(profile["exportArchive"])
+        self.ui.skipUnchanged.setChecked(profile.get("skipUnchanged", True))
+        self.ui.memoryLimit.setValue(profile.get("memoryLimit", 0))
+        self.ui.prefetchImages.setValue(profile.get("prefetchImages", 0))
+        self.ui.memoryMap.setValue(profile.get("memoryMap", 0))
         self.ui.ignorablePixels.setValue(profile["ignorablePixels"])
         self.ui.lineSteps.setValue(profile["lineSteps"])
         self.ui.lossyQualitySlider.setValue(profile["lossyQuality"])
@@ -274,7 +363,9 @@ class MainWindow(QtStyleTools):
         )
         self.ui.sensitivity.setValue(profile["sensitivity"])
         self.ui.settingsProfiles.setCurrentIndex(
-            self.profilesModel.getProfileIndex(profile["name"])
+            self.profilesFilter.mapFromSource(
+                self.profilesModel.getProfileIndex(profile["name"])
+            )
         )
         self.ui.splitValue.setValue(profile["splitValue"])
         self.ui.splitMethod.setCurrentText(profile["splitMethod"].capitalize())
@@ -282,6 +373,7 @@ class MainWindow(QtStyleTools):
         self.ui.widthEnforcementSpinBox.setValue(profile["widthEnforcementFixedValue"])
         self.ui.matchSource.setChecked(profile["matchSource"])
         self.ui.writeMetadata.setChecked(profile["writeMetadata"])
+        self.ui.profileTags.setText(", ".join(profile.get("tags", ())))
 
         self.enable_match_source(profile["matchSource"])
         if profile["enablePostProcess"]:
@@ -299,6 +391,10 @@ class MainWindow(QtStyleTools):
         profile["detectionType"] = self.ui.detectionType.currentText()
         profile["enablePostProcess"] = self.ui.enablePostProcess.isChecked()
         profile["exportArchive"] = self.ui.exportArchive.isChecked()
+        profile["skipUnchanged"] = self.ui.skipUnchanged.isChecked()
+        profile["memoryLimit"] = self.ui.memoryLimit.value()
+        profile["prefetchImages"] = self.ui.prefetchImages.value()
+        profile["memoryMap"] = self.ui.memoryMap.value()
         profile["ignorablePixels"] = self.ui.ignorablePixels.value()
         profile["lineSteps"] = self.ui.lineSteps.value()
         profile["lossyQuality"] = self.ui.lossyQualitySlider.value()
@@ -312,6 +408,9 @@ class MainWindow(QtStyleTools):
         profile["widthEnforcementFixedValue"] = self.ui.widthEnforcementSpinBox.value()
         profile["matchSource"] = self.ui.matchSource.isChecked()
         profile["writeMetadata"] = self.ui.writeMetadata.isChecked()
+        profile["tags"] = [
+            tag.strip() for tag in self.ui.profileTags.text().split(",") if tag.strip()
+        ]
 
         return profile
 
@@ -324,6 +423,50 @@ class MainWindow(QtStyleTools):
         else:
             self.profilesModel.addProfile(profile)
 
+    def selected_profile(self):
+        """Returns profilesModel index of the profile selected in settings tab"""
+
+        return self.profilesFilter.mapToSource(self.ui.settingsProfiles.currentIndex())
+
+    def import_profiles(self):
+        paths, _ = QFileDialog.getOpenFileNames(
+            self.ui, "Import Profiles", str(Path.home()), "Profiles (*.json)"
+        )
+        count = 0
+        for path in paths:
+            try:
+                profiles = read_profiles(path)
+            except (OSError, ValueError) as e:
+                self.status(f"ERROR: {e}", "error")
+                return
+            for profile in profiles:
+                self.profilesModel.addProfile(profile)
+            count += len(profiles)
+        if count:
+            self.status(f"Imported {count} profiles")
+
+    def export_profiles(self):
+        """Exports the profiles shown in settings tab to a file"""
+
+        path, _ = QFileDialog.getSaveFileName(
+            self.ui,
+            "Export Profiles",
+            str(Path.home() / "stitchtoon-profiles.json"),
+            "Profiles (*.json)",
+        )
+        if not path:
+            return
+        profiles = [
+            self.profilesFilter.index(row, 0).data(Qt.UserRole)
+            for row in range(self.profilesFilter.rowCount())
+        ]
+        try:
+            write_profiles(path, profiles)
+        except OSError as e:
+            self.status(f"ERROR: {e}", "error")
+        else:
+            self.status(f"Exported {len(profiles)} profiles")
+
     def show_lossy_quality(self, format):
         state = False
         if format.lower() in SUPPORTS_LOSSY_QUALITY:
@@ -339,26 +482,13 @@ class MainWindow(QtStyleTools):
 
     def change_theme(self, theme):
         settings["theme"] = theme
-        theme = theme.lower().replace(" ", "_")
-        if "dark" in theme:
-            invert_secondary = False
-        elif "light" in theme:
-            invert_secondary = True
-
-        apply_stylesheet(
-            self.ui,
-            theme + ".xml",
-            invert_secondary=invert_secondary,
-            css_file=CUSTOM_CSS,
-            extra=STYLE_EXTRA,
-        )
+        apply_theme(self.ui, theme)
 
     def enable_postprocess(self, state):
         self.ui.postProcessWidget.setEnabled(state)
 
     def check_for_update(self):
         self.check_update_thread = UpdateCheckThread()
-        self.check_update_thread.setTerminationEnabled(True)
         self.check_update_thread.updateAvailable.connect(self.show_update_dialog)
 
         try:
@@ -367,6 +497,8 @@ class MainWindow(QtStyleTools):
             self.status(f"ERROR: {e}", "error")
 
     def validate_form(self):
+        from stitchtoon.utils.constants import SMALLER_ALLOWED_HEIGHT
+
         valid = False
         if not self.ui.input.text():
             self.status("Input field can't be empty", "error")
@@ -400,56 +532,45 @@ class MainWindow(QtStyleTools):
         return valid
 
     def start(self):
+        from ..threads.process import ProcessThread
+
         if not self.validate_form():
             return
 
-        self.progress.update(0)
+        token = CancellationToken()
+        self.progress.reset(token)
         self.status("")
         self.ui.postProcessConsole.clear()
 
         profile = self.make_profile(self.ui.profile.currentText())
-        stitch_params = {
-            "detection_type": profile["detectionType"].lower(),
-            "sensitivity": int(profile["sensitivity"]),
-            "custom_width": int(profile["widthEnforcementFixedValue"]),
-            "width_enforce": profile["widthEnforcement"],
-            "line_steps": int(profile["lineSteps"]),
-            "ignorable_pixels": int(profile.get("ignorablePixels")),
-        }
-
-        kwargs = {
-            "input": self.ui.input.text(),
-            "output": self.ui.output.text(),
-            "split_height": int(
-                profile["splitValue"]
-                if self.ui.splitMethod.currentText().upper().replace(" ", "_")
-                == "SPLIT_HEIGHT"
-                else 0
-            ),
-            "images_number": int(
-                profile["splitValue"]
-                if self.ui.splitMethod.currentText().upper().replace(" ", "_")
-                == "IMAGES_NUMBER"
-                else 0
-            ),
-            "output_format": profile["outputFormat"],
-            "recursive": bool(profile["batchMode"]),
-            "as_archive": bool(profile["exportArchive"]),
-            "lossy_quality": int(profile["lossyQuality"]),
-            "progress": self.progress,
-            "slice_to_metadata": bool(profile["matchSource"]),
-            "write_metadata": bool(profile["writeMetadata"]),
-            "params": stitch_params,
-        }
-
-        self.thread = ProcessThread(params=kwargs)
-        self.thread.setTerminationEnabled(True)
-        self.thread.finished.connect(lambda success: self.ui.start.setEnabled(True))
-        self.thread.exceptionRaised.connect(lambda e: self.status(e, "error"))
+        kwargs = make_process_kwargs(
+            profile, self.ui.input.text(), self.ui.output.text(), self.progress
+        )
+
+        # chapter and file post processing starts as soon as a chapter is written
+        stream = self.postprocess_scope() not in (None, POSTPROCESS_SCOPE.OUTPUT)
+        self.thread = ProcessThread(
+            params=kwargs, workers=self.ui.workers.value(), token=token
+        )
         self.thread.finished.connect(
-            lambda suc: self.postprocess_start() if suc else None
+            lambda success: self.ui.start.setText(
+                "Stop" if self.is_postprocessing() else "Start"
+            )
         )
-        self.ui.start.setEnabled(False)
+        self.thread.finished.connect(lambda success: self.progress.flush())
+        self.thread.exceptionRaised.connect(lambda e: self.status(e, "error"))
+        self.thread.canceled.connect(lambda: self.status("Canceled", "warning"))
+        self.thread.statsReady.connect(self.show_run_stats)
+        if stream:
+            postprocess = self.postprocess_start()
+            self.thread.chapterDone.connect(postprocess.add_target)
+            self.thread.canceled.connect(postprocess.stop)
+            self.thread.finished.connect(lambda suc: postprocess.close())
+        else:
+            self.thread.finished.connect(
+                lambda suc: self.postprocess_output(kwargs) if suc else None
+            )
+        self.ui.start.setText("Stop")
 
         try:
             self.thread.start()
@@ -459,6 +580,87 @@ class MainWindow(QtStyleTools):
         else:
             return 0
 
+    def set_progress_format(self, text=None, figures=None):
+        if text is not None:
+            self.progress_text = text
+        if figures is not None:
+            self.progress_figures = figures
+        self.ui.progressBar.setFormat(
+            f"{self.progress_text} %p%{self.progress_figures}"
+        )
+
+    def show_run_stats(self, record):
+        self.status(format_record(record), "success")
+        self.set_progress_format(figures="")
+        self.ui.progressBar.setToolTip(
+            "\n".join(
+                f"{stage.capitalize()}: {format_seconds(seconds)}"
+                for stage, seconds in record["stages"].items()
+            )
+        )
+
+    def is_running(self) -> bool:
+        return any(
+            thread and thread.isRunning()
+            for thread in (self.thread, self.postprocess_thread)
+        )
+
+    def stop(self):
+        """Stops stitching or post process, whichever is running"""
+
+        for thread in (self.thread, self.postprocess_thread):
+            if thread and thread.isRunning():
+                thread.stop()
+        self.status("Stopping...", "warning")
+
+    def add_job(self):
+        if not self.validate_form():
+            return
+
+        profile = self.make_profile(self.ui.profile.currentText())
+        self.jobsModel.addJob(Job(self.ui.input.text(), self.ui.output.text(), profile))
+        self.status(f"Jobs in queue: {self.jobsModel.rowCount()}")
+
+    def move_job(self, step):
+        index = self.ui.jobs.currentIndex()
+        if self.jobsModel.moveJob(index, step):
+            self.ui.jobs.setCurrentIndex(self.jobsModel.index(index.row() + step, 0))
+
+    def retry_job(self):
+        self.jobsModel.retryJob(self.ui.jobs.currentIndex())
+        self.jobQueue.dispatch()
+
+    def start_queue(self):
+        if self.jobQueue.isRunning():
+            self.jobQueue.stop()
+            self.status("Queue stopping, running jobs are canceled", "warning")
+            return
+
+        if not self.jobsModel.countJobs(JOB_STATUS.QUEUED):
+            self.status("No queued jobs", "warning")
+            return
+
+        self.status("")
+        self.jobQueue.start(
+            self.ui.workers.value(), self.ui.workerType.currentText().lower()
+        )
+
+    def update_queue_progress(self, *args):
+        total = self.jobsModel.rowCount()
+        done = self.jobsModel.countJobs(JOB_STATUS.DONE) + self.jobsModel.countJobs(
+            JOB_STATUS.FAILED
+        )
+        self.ui.queueProgressBar.setMaximum(max(total, 1))
+        self.ui.queueProgressBar.setValue(done)
+        self.ui.queueProgressBar.setFormat(f"{done}/{total}")
+
+    def queue_finished(self):
+        failed = self.jobsModel.countJobs(JOB_STATUS.FAILED)
+        if failed:
+            self.status(f"Queue finished, {failed} failed job(s)", "error")
+        else:
+            self.status("Queue finished", "success")
+
     def status(self, msg, type="normal"):
         color = self._get_msg_color(type)
         self.ui.statusbar.setStyleSheet(f"color: {color};")
@@ -482,43 +684,86 @@ class MainWindow(QtStyleTools):
 
         return color
 
-    def postprocess_console(self, msg, type="normal"):
-        color = self._get_msg_color(type)
-        self.ui.postProcessConsole.setTextColor(color)
-        self.ui.postProcessConsole.append(msg)
-        normal = self._get_msg_color("normal")
-        self.ui.postProcessConsole.setTextColor(normal)
+    def postprocess_console(self, chunks):
+        """Appends a ConsoleWorker batch, one insert per run of same type lines"""
+
+        console = self.ui.postProcessConsole
+        scrollbar = console.verticalScrollBar()
+        follow = scrollbar.value() == scrollbar.maximum()
+        cursor = QTextCursor(console.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        char_format = QTextCharFormat()
+        for msg, type in chunks:
+            char_format.setForeground(QColor(self._get_msg_color(type)))
+            if not console.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertText(msg, char_format)
+        cursor.endEditBlock()
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def postprocess_scope(self):
+        """Returns post process scope, None when post process is disabled"""
 
-    def postprocess_start(self):
         if not self.ui.enablePostProcess.isChecked():
+            return None
+        return get_scope(self.ui.postProcessArgs.text())
+
+    def is_postprocessing(self) -> bool:
+        return bool(self.postprocess_thread and self.postprocess_thread.isRunning())
+
+    def postprocess_output(self, kwargs):
+        """Post processes the output of a finished run"""
+
+        postprocess = self.postprocess_start()
+        if not postprocess:
             return
+        postprocess.add_target(kwargs["output"])
+        postprocess.close()
 
-        cmd = " ".join(shlex.split(self.ui.postProcessScript.text()))
-        args = (
-            " ".join(shlex.split(self.ui.postProcessArgs.text()))
-            .replace("$input", self.ui.input.text())
-            .replace("$output", self.ui.output.text())
+    def postprocess_start(self):
+        """Starts a post process thread waiting for targets, None if disabled"""
+
+        from ..threads.postprocess import PostProcessThread
+
+        if not self.ui.enablePostProcess.isChecked():
+            return None
+
+        self.console.open(osp.join(data_dir(LOG_REL_DIR), "postprocess.log"))
+        self.postprocess_thread = PostProcessThread(
+            self.ui.postProcessScript.text(),
+            self.ui.postProcessArgs.text(),
+            self.console,
+            input=self.ui.input.text(),
+            output=self.ui.output.text(),
+            workers=self.ui.postProcessWorkers.value(),
         )
-        self.postprocess_thread = PostProcessThread(cmd, args)
-        self.postprocess_thread.setTerminationEnabled(True)
-        self.postprocess_thread.console.connect(self.postprocess_console)
         self.postprocess_thread.started.connect(
             lambda: self.status("Post Process Started")
         )
+        self.postprocess_thread.finished.connect(self.postprocess_finished)
         self.postprocess_thread.finished.connect(
-            lambda success: self.status("Post Process Finished")
-            if success == os.EX_OK
-            else self.status("Post Process Faild", "error")
-        )
-        self.postprocess_thread.finished.connect(
-            lambda success: self.ui.start.setEnabled(True)
+            lambda success: self.ui.start.setText("Start")
         )
-        self.ui.start.setEnabled(False)
+        self.ui.start.setText("Stop")
 
         try:
             self.postprocess_thread.start()
         except Exception as e:
             self.status(f"ERROR: {e}")
+        return self.postprocess_thread
+
+    def postprocess_finished(self, return_code):
+        self.console.close()
+        self.console.write(f"Full output: {self.console.spool_path}")
+        self.console.flush()
+        if self.postprocess_thread.isInterruptionRequested():
+            self.status("Post Process Canceled", "warning")
+        elif return_code == os.EX_OK:
+            self.status("Post Process Finished")
+        else:
+            self.status("Post Process Faild", "error")
 
     def browse_dialog(self, current_path=None):
         if not current_path:
@@ -551,7 +796,8 @@ class MainWindow(QtStyleTools):
 
     def reset(self):
         settings.reset()
-        self.profilesModel.setItems(settings.get_profiles())
+        self.profilesModel.reload()
+        self.profilesFilter.updateMatches()
         self.load_profile(settings.get_profile())
 
     def show_update_dialog(self, version, url):
@@ -599,6 +845,65 @@ class MainWindow(QtStyleTools):
         msg.setStandardButtons(QMessageBox.Cancel)
         msg.exec_()
 
+    def preview(self):
+        """Requests a slices preview of the input with current options"""
+
+        from ..threads.preview import PreviewThread
+
+        if self.ui.Tabs.currentWidget() is not self.ui.AdvancedTab:
+            return
+        if not osp.isdir(self.ui.input.text()):
+            self.ui.previewStatus.setText("Choose an input to preview")
+            self.slicePreview.clear()
+            return
+
+        if self.preview_thread is None:
+            self.preview_thread = PreviewThread()
+            self.preview_thread.stripReady.connect(self.show_preview_strip)
+            self.preview_thread.slicesReady.connect(self.show_preview_slices)
+            self.preview_thread.exceptionRaised.connect(self.show_preview_error)
+            self.preview_thread.start()
+        self.ui.previewStatus.setText("Detecting...")
+        self.preview_thread.request(
+            make_process_kwargs(
+                self.make_profile(self.ui.profile.currentText()),
+                self.ui.input.text(),
+                self.ui.output.text(),
+            )
+        )
+
+    def show_preview_strip(self, strip, scale):
+        self.preview_scale = scale
+        self.slicePreview.setStrip(strip)
+
+    def show_preview_slices(self, points):
+        self.slicePreview.setSlices(points)
+        heights = [
+            round((end - start) / self.preview_scale)
+            for start, end in zip(points, points[1:])
+        ]
+        text = f"{len(heights)} slice{'' if len(heights) == 1 else 's'}"
+        if heights and min(heights) == max(heights):
+            text += f", {heights[0]} px"
+        elif heights:
+            text += f", {min(heights)}-{max(heights)} px"
+        self.ui.previewStatus.setText(text)
+
+    def show_preview_error(self, error):
+        self.ui.previewStatus.setText(error)
+        self.slicePreview.clear()
+
     def exit_handler(self):
         settings["current-profile"] = self.make_profile(self.ui.profile.currentText())
         settings.sync()
+        self.jobQueue.stop()
+        self.jobQueue.wait()
+        for thread in (
+            self.thread,
+            self.postprocess_thread,
+            self.check_update_thread,
+            self.preview_thread,
+        ):
+            if thread and thread.isRunning():
+                thread.stop()
+                thread.wait()
@@ -0,0 +1,188 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Compiled UI and cached qt-material stylesheets, see `scripts/build_resources.py`
+
+Both are optional, a missing or outdated one falls back to runtime loading.
+"""
+
+import hashlib
+import json
+import os
+import os.path as osp
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version
+from importlib.util import find_spec
+from pathlib import Path
+
+from PySide6.QtCore import QDir
+from PySide6.QtCore import QFile
+from PySide6.QtCore import QIODevice
+from PySide6.QtCore import QStandardPaths
+from PySide6.QtGui import QColor
+from PySide6.QtGui import QFontDatabase
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtGui import QPalette
+
+
+RESOURCES = Path(__file__).parent / "resources"
+LAYOUT = RESOURCES / "layout.ui"
+COMPILED_LAYOUT = Path(__file__).parent / "layout_ui.py"
+CUSTOM_CSS = RESOURCES / "custom.css"
+BUNDLED_THEMES = RESOURCES / "themes"
+STYLE_EXTRA = {}
+# Colors qt-material exports to the environment, custom.css is formatted with them
+THEME_ENVIRON = (
+    "QTMATERIAL_PRIMARYCOLOR",
+    "QTMATERIAL_PRIMARYLIGHTCOLOR",
+    "QTMATERIAL_SECONDARYCOLOR",
+    "QTMATERIAL_SECONDARYLIGHTCOLOR",
+    "QTMATERIAL_SECONDARYDARKCOLOR",
+    "QTMATERIAL_PRIMARYTEXTCOLOR",
+    "QTMATERIAL_SECONDARYTEXTCOLOR",
+    "QTMATERIAL_THEME",
+)
+
+_fonts_added = False
+
+
+def layout_hash() -> str:
+    return hashlib.sha1(LAYOUT.read_bytes()).hexdigest()
+
+
+def load_ui():
+    """Loads compiled UI, or UI File when it is missing or outdated"""
+
+    try:
+        from .layout_ui import LAYOUT_HASH
+        from .layout_ui import MainWindowUi
+    except ImportError:
+        pass
+    else:
+        if LAYOUT_HASH == layout_hash():
+            return MainWindowUi()
+
+    from PySide6.QtUiTools import QUiLoader
+
+    loader = QUiLoader()
+    ui_file = QFile(LAYOUT)
+    ui_file.open(QIODevice.ReadOnly)
+    ui = loader.load(ui_file)
+    ui_file.close()
+    return ui
+
+
+def theme_slug(theme: str) -> str:
+    """`Dark Teal` -> `dark_teal`"""
+
+    return theme.lower().replace(" ", "_")
+
+
+def themes_key() -> str:
+    """Cache key of rendered themes, None when qt-material version is unknown"""
+
+    try:
+        return f"qt-material-{version('qt-material')}"
+    except PackageNotFoundError:
+        return None
+
+
+def themes_dirs() -> list[Path]:
+    """Directories searched for a rendered theme, bundled ones first"""
+
+    key = themes_key()
+    if not key:
+        return []
+    cache = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    return [BUNDLED_THEMES / key, Path(cache) / "stitchtoon" / "themes" / key]
+
+
+def render_theme(theme: str, directory: Path = None) -> str:
+    """Renders a theme with qt-material, caching it in directory if given
+
+    Rendering also sets icons, fonts and palette up like `apply_stylesheet`.
+    """
+
+    from qt_material import build_stylesheet
+
+    slug = theme_slug(theme)
+    icons = str(directory / slug) if directory else "theme"
+    stylesheet = build_stylesheet(
+        slug + ".xml",
+        invert_secondary="light" in slug,
+        extra=dict(STYLE_EXTRA),
+        parent=icons,
+    )
+    stylesheet += CUSTOM_CSS.read_text().format(**os.environ)
+    # qt-material appends to the icon search paths, keep only this theme icons
+    QDir.setSearchPaths("icon", QDir.searchPaths("icon")[-1:])
+
+    if directory:
+        environ = {name: os.environ[name] for name in THEME_ENVIRON}
+        try:
+            (directory / f"{slug}.json").write_text(json.dumps(environ))
+            (directory / f"{slug}.qss").write_text(stylesheet)
+        except OSError:
+            pass
+    return stylesheet
+
+
+def load_theme(theme: str) -> str:
+    """Returns a cached theme stylesheet after setting its icons, fonts and
+    palette up, None when not cached"""
+
+    slug = theme_slug(theme)
+    for directory in themes_dirs():
+        qss = directory / f"{slug}.qss"
+        environ = directory / f"{slug}.json"
+        if qss.is_file() and environ.is_file() and (directory / slug).is_dir():
+            break
+    else:
+        return None
+
+    environ = json.loads(environ.read_text())
+    os.environ.update(environ)
+    add_fonts()
+    set_placeholder_color(environ["QTMATERIAL_PRIMARYCOLOR"])
+    QDir.setSearchPaths("icon", [str(directory / slug)])
+    return qss.read_text()
+
+
+def apply_theme(widget, theme: str) -> None:
+    """Applies a theme to widget, rendering and caching it on first use"""
+
+    stylesheet = load_theme(theme)
+    if stylesheet is None:
+        dirs = themes_dirs()
+        directory = dirs[-1] if dirs else None
+        if directory:
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                directory = None
+        stylesheet = render_theme(theme, directory)
+    widget.setStyleSheet(stylesheet)
+
+
+def add_fonts() -> None:
+    """Adds qt-material fonts without importing it"""
+
+    global _fonts_added
+    if _fonts_added:
+        return
+    _fonts_added = True
+
+    spec = find_spec("qt_material")
+    if not spec or not spec.submodule_search_locations:
+        return
+    fonts = osp.join(spec.submodule_search_locations[0], "fonts", "roboto")
+    for name in os.listdir(fonts) if osp.isdir(fonts) else ():
+        if name.endswith(".ttf"):
+            QFontDatabase.addApplicationFont(osp.join(fonts, name))
+
+
+def set_placeholder_color(primary: str) -> None:
+    color = QColor(primary)
+    color.setAlpha(92)
+    palette = QGuiApplication.palette()
+    palette.setColor(QPalette.PlaceholderText, color)
+    QGuiApplication.setPalette(palette)
@@ -1,63 +1,121 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+from ..utils.profile_store import ProfileStore
 from ..utils.settings import Profile
 from PySide6.QtCore import QAbstractListModel
 from PySide6.QtCore import QModelIndex
+from PySide6.QtCore import QSortFilterProxyModel
 from PySide6.QtCore import Qt
 from PySide6.QtCore import Signal
 
 
 class ProfilesListModel(QAbstractListModel):
+    """Profile names of a store in order, indexed by name
+
+    Bodies are only read from the store when asked for with Qt.UserRole.
+    """
+
     profileAdded = Signal(dict)
     profileUpdated = Signal(dict)
     profileDeleted = Signal()
 
-    def __init__(self, profiles: dict[str, Profile] = None, parent=None):
+    def __init__(self, store: ProfileStore, parent=None):
         super().__init__(parent)
-        self.profiles = profiles
+        self.store = store
+        self.names = []
+        self.rows = {}
+        self._setNames(store.names())
+
+    def _setNames(self, names: list[str]):
+        self.names = names
+        self.rows.clear()
+        self._reindex()
+
+    def _reindex(self, start: int = 0):
+        for row in range(start, len(self.names)):
+            self.rows[self.names[row]] = row
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self.profiles.keys())
+        return len(self.names)
 
     def data(self, index, role):
         row = index.row()
-        if not index.isValid() or row >= len(self.profiles.keys()):
+        if not index.isValid() or row >= len(self.names):
             return None
         if role == Qt.DisplayRole:
-            return list(self.profiles.keys())[row]
-        elif role == Qt.ItemDataRole:
-            return list(self.profiles.values())[row]
+            return self.names[row]
+        elif role == Qt.UserRole:
+            return self.store[self.names[row]]
         else:
             return None
 
     def getProfileIndex(self, name: str):
-        return self.createIndex(list(self.profiles.keys()).index(name), 0, 0)
+        row = self.rows.get(name)
+        return QModelIndex() if row is None else self.index(row, 0)
 
-    def setItems(self, profiles: dict[str, Profile]):
+    def reload(self):
         self.beginResetModel()
-        self.profiles = profiles
+        self._setNames(self.store.names())
         self.endResetModel()
 
     def addProfile(self, profile: Profile):
-        self.beginInsertRows(QModelIndex(), self.rowCount() - 1, 1)
-        self.profiles[profile["name"]] = profile
+        if self.hasProfile(profile):
+            self.updateProfile(profile)
+            return
+        self.store.put(profile)
+        row = len(self.names)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.append(profile["name"])
+        self.rows[profile["name"]] = row
         self.endInsertRows()
         self.profileAdded.emit(profile)
 
     def updateProfile(self, profile: Profile):
-        self.profiles[profile["name"]] = profile
+        self.store.put(profile)
+        index = self.getProfileIndex(profile["name"])
+        self.dataChanged.emit(index, index)
         self.profileUpdated.emit(profile)
 
     def deleteProfile(self, index):
-        name = list(self.profiles.keys())[index.row()]
-        self.beginRemoveRows(QModelIndex(), index.row(), index.row())
-        del self.profiles[name]
+        row = index.row()
+        if not index.isValid() or row >= len(self.names):
+            return
+        self.store.delete(self.names[row])
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[self.names.pop(row)]
+        self._reindex(row)
         self.endRemoveRows()
         self.profileDeleted.emit()
 
-    def getProfiles(self):
-        return self.profiles
+    def getProfiles(self) -> ProfileStore:
+        return self.store
 
     def hasProfile(self, profile: Profile):
-        return self.profiles.get(profile["name"]) is not None
+        return profile["name"] in self.rows
+
+
+class ProfilesFilterModel(QSortFilterProxyModel):
+    """Shows profiles whose name contains the search or a tag starts with it"""
+
+    def __init__(self, source: ProfilesListModel, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.search = ""
+        self.matches = None
+        source.profileAdded.connect(self.updateMatches)
+        source.profileUpdated.connect(self.updateMatches)
+
+    def setSearch(self, text: str):
+        self.search = text.strip()
+        self.updateMatches()
+
+    def updateMatches(self, *args):
+        store = self.sourceModel().store
+        self.matches = set(store.search(self.search)) if self.search else None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, row, parent):
+        if self.matches is None:
+            return True
+        return self.sourceModel().names[row] in self.matches
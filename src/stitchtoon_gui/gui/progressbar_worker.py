@@ -1,22 +1,42 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+from ..utils.constants import PROGRESS_RATE
+from ..utils.stats import RunStats
+from ..utils.throttle import Throttle
 from PySide6.QtCore import QObject
 from PySide6.QtCore import Signal
 
 
 class ProgressWorker(QObject):
+    """Progress handler passed to stitchtoon
+
+    stitchtoon updates it for every image and slice from the worker thread,
+    updates are merged and emitted at most `rate` times per second so the
+    event loop is not flooded with queued signals. Reaching `size`, `finish`
+    and `flush` always emit. Updates also feed `stats`, whose live figures
+    are emitted along with the value.
+    """
+
     started = Signal()
     finished = Signal()
     valueChanged = Signal(int)
     textChanged = Signal(str)
+    statsChanged = Signal(dict)
 
-    def __init__(self, prefix="", size=100, parent=None):
+    def __init__(
+        self, prefix="", size=100, token=None, rate=PROGRESS_RATE, parent=None
+    ):
         super().__init__(parent)
         self.prefix = prefix
         self.size = size
+        self.token = token
+        self.throttle = Throttle(rate)
+        self.stats = RunStats()
         self._value = 0
         self._precent = size
+        self._emitted_value = None
+        self._emitted_prefix = prefix
 
     @property
     def value(self):
@@ -29,16 +49,42 @@ class ProgressWorker(QObject):
         self._value = value
 
     def update(self, value, msg=""):
+        # stitchtoon calls update between images and slices, the only points
+        # a run can be stopped at without leaving half written files
+        if self.token:
+            self.token.raise_if_canceled()
         self.value = value
-        self.valueChanged.emit(self._value)
+        self.stats.update(value, msg)
         if msg:
             self.prefix = msg
+        if self.throttle(force=value >= self.size):
+            self.flush()
+
+    def flush(self):
+        """Emits pending changes"""
+
+        if self._value != self._emitted_value:
+            self._emitted_value = self._value
+            self.valueChanged.emit(self._value)
+            self.statsChanged.emit(self.stats.live(self._value, self.size))
+        if self.prefix != self._emitted_prefix:
+            self._emitted_prefix = self.prefix
             self.textChanged.emit(self.prefix)
 
+    def reset(self, token=None):
+        """Prepares for a new run"""
+
+        self.token = token
+        self.stats = RunStats()
+        self._value = 0
+        self.flush()
+
     def start(self):
         self.started.emit()
         self.update(0, "started")
+        self.flush()
 
     def finish(self):
         self.finished.emit()
         self.update(self.size, "completed")
+        self.flush()
@@ -0,0 +1,56 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QImage
+from PySide6.QtGui import QPainter
+from PySide6.QtGui import QPen
+from PySide6.QtWidgets import QWidget
+
+
+class SlicePreview(QWidget):
+    """Preview strip with cut lines, scaled to the widget width"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.strip = QImage()
+        self.points = []
+
+    def setStrip(self, strip: QImage):
+        self.strip = strip
+        self.points = []
+        self.fitHeight()
+        self.update()
+
+    def setSlices(self, points: list[int]):
+        self.points = points
+        self.update()
+
+    def clear(self):
+        self.setStrip(QImage())
+
+    def ratio(self) -> float:
+        if self.strip.isNull():
+            return 0.0
+        return self.width() / self.strip.width()
+
+    def fitHeight(self):
+        self.setMinimumHeight(int(self.strip.height() * self.ratio()))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.fitHeight()
+
+    def paintEvent(self, event):
+        if self.strip.isNull():
+            return
+        ratio = self.ratio()
+        painter = QPainter(self)
+        painter.drawImage(
+            QRectF(0, 0, self.width(), self.strip.height() * ratio), self.strip
+        )
+        painter.setPen(QPen(self.palette().highlight(), 2))
+        for point in self.points[1:-1]:
+            y = point * ratio
+            painter.drawLine(0, int(y), self.width(), int(y))
+        painter.end()
@@ -0,0 +1,119 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Manager
+
+from ..utils.cancellation import Canceled
+from ..utils.cancellation import CancellationToken
+from ..utils.constants import DEFAULT_WORKERS
+from ..utils.constants import WORKER_TYPE
+from ..utils.jobs import JOB_STATUS
+from ..utils.jobs import Job
+from ..utils.jobs import run_job
+from ..utils.params import make_process_kwargs
+from PySide6.QtCore import QObject
+from PySide6.QtCore import Qt
+from PySide6.QtCore import Signal
+
+
+class JobQueue(QObject):
+    """Runs queued jobs on a pool of workers in the jobs list order.
+
+    Jobs are only touched from the thread owning the queue, workers report
+    back through `jobDone` which Qt queues to that thread. Stopping cancels
+    running jobs through a token shared with the workers, canceled jobs are
+    queued again.
+    """
+
+    started = Signal()
+    finished = Signal()
+    jobChanged = Signal(object)
+    jobDone = Signal(object, object)
+
+    def __init__(self, jobs: list[Job], parent=None):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.workers = 1
+        self.executor = None
+        self.manager = None
+        self.token = None
+        self.running = set()
+        self.stopping = False
+        self.jobDone.connect(self._on_job_done, Qt.QueuedConnection)
+
+    def isRunning(self) -> bool:
+        return self.executor is not None
+
+    def start(self, workers: int, worker_type: str = WORKER_TYPE.THREADS.value):
+        if self.isRunning():
+            return
+        self.workers = max(1, int(workers))
+        if worker_type == WORKER_TYPE.PROCESSES.value:
+            # worker processes can't see a threading token, they get a shared one
+            self.manager = Manager()
+            self.token = CancellationToken(self.manager.Event())
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self.token = CancellationToken()
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.stopping = False
+        self.started.emit()
+        self.dispatch()
+
+    def stop(self):
+        """Stops dispatching and cancels running jobs"""
+
+        self.stopping = True
+        if self.token:
+            self.token.cancel()
+        if self.isRunning() and not self.running:
+            self.dispatch()
+
+    def wait(self):
+        """Waits for running jobs to return, after `stop` canceled them"""
+
+        if self.isRunning():
+            self.executor.shutdown(wait=True)
+
+    def dispatch(self):
+        """Submits queued jobs until all workers are busy"""
+
+        if not self.isRunning():
+            return
+        while not self.stopping and len(self.running) < self.workers:
+            job = next((j for j in self.jobs if j.status == JOB_STATUS.QUEUED), None)
+            if job is None:
+                break
+            kwargs = make_process_kwargs(job.profile, job.input, job.output)
+            kwargs["encode_workers"] = max(1, DEFAULT_WORKERS // self.workers)
+            future = self.executor.submit(run_job, kwargs, self.token)
+            job.status = JOB_STATUS.RUNNING
+            job.error = ""
+            job.attempts += 1
+            self.running.add(job)
+            self.jobChanged.emit(job)
+            future.add_done_callback(
+                lambda future, job=job: self.jobDone.emit(job, future.exception())
+            )
+
+        if not self.running:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            if self.manager:
+                self.manager.shutdown()
+                self.manager = None
+            self.token = None
+            self.finished.emit()
+
+    def _on_job_done(self, job: Job, error: Exception):
+        self.running.discard(job)
+        if isinstance(error, Canceled):
+            job.status = JOB_STATUS.QUEUED
+            job.error = ""
+        else:
+            job.status = JOB_STATUS.FAILED if error else JOB_STATUS.DONE
+            job.error = str(error or "")
+        self.jobChanged.emit(job)
+        self.dispatch()
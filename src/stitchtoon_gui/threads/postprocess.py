@@ -1,34 +1,143 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import Lock
+
+from ..utils.postprocess import expand_commands
 from PySide6.QtCore import QThread
 from PySide6.QtCore import Signal
-from stitchtoon.services import postprocess_run
 from stitchtoon.services.global_logger import logFunc
 
 
 class PostProcessThread(QThread):
+    """Runs post process commands for targets given with `add_target`
+
+    Depending on the args placeholders, a target gets one command over the
+    whole output, one per chapter (`$chapter`) or one per file (`$file`).
+    Targets may be added while the thread runs, so chapters are post processed
+    while the next ones are stitched, up to `workers` commands run at once.
+    `close` tells no more targets are coming.
+    """
+
     started = Signal()
     finished = Signal(int)
-    console = Signal(str, str)
 
-    def __init__(self, cmd: str, args: str, parent=None):
+    def __init__(
+        self,
+        cmd: str,
+        args: str,
+        console,
+        input: str = "",
+        output: str = "",
+        workers: int = 1,
+        parent=None,
+    ):
         super().__init__(parent)
         self.cmd = cmd
         self.args = args
+        self.console = console
+        self.input = input
+        self.output = output
+        self.workers = max(1, workers)
+        self.targets = Queue()
+        self.procs = set()
+        self.lock = Lock()
+
+    def add_target(self, target: str):
+        self.targets.put(target)
+
+    def close(self):
+        self.targets.put(None)
 
     @logFunc(inclass=True)
     def run(self):
         self.started.emit()
         try:
-            return_code = postprocess_run(self.cmd, self.args, self.console_print)
+            return_code = self.run_commands()
         except Exception as e:
             self.console_print(f"ERROR: {e}", "error")
+            self.finished.emit(1)
         else:
             self.finished.emit(return_code)
 
+    def run_commands(self) -> int:
+        """Runs commands of targets as they come until closed"""
+
+        futures = []
+        with ThreadPoolExecutor(self.workers) as executor:
+            while not self.isInterruptionRequested():
+                target = self.targets.get()
+                if target is None:
+                    break
+                for label, command in expand_commands(
+                    self.cmd, self.args, self.input, self.output, target
+                ):
+                    futures.append(executor.submit(self.run_command, command, label))
+            if self.isInterruptionRequested():
+                executor.shutdown(cancel_futures=True)
+
+        return_codes = [
+            future.result()
+            for future in futures
+            if not future.cancelled() and future.result()
+        ]
+        if self.isInterruptionRequested():
+            self.console_print("\nPost process canceled", "warning")
+        elif return_codes:
+            self.console_print(
+                f"\n{len(return_codes)} of {len(futures)} commands failed", "error"
+            )
+        else:
+            self.console_print(
+                "\n" + "-" * 15 + "\nPost process finished successfully!\n", "success"
+            )
+        return return_codes[0] if return_codes else 0
+
+    def run_command(self, command: str, label: str = "") -> int:
+        """Runs one command, keeps its handle so it can be stopped"""
+
+        if self.isInterruptionRequested():
+            return 0
+        prefix = f"[{label}] " if label else ""
+        proc = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding="utf-8",
+            errors="replace",
+            universal_newlines=True,
+            shell=True,
+        )
+        with self.lock:
+            self.procs.add(proc)
+        try:
+            with proc.stdout:
+                for line in proc.stdout:
+                    self.console_print(prefix + line)
+            return_code = proc.wait()
+        finally:
+            with self.lock:
+                self.procs.discard(proc)
+
+        if return_code and not self.isInterruptionRequested():
+            self.console_print(
+                prefix + str(subprocess.CalledProcessError(return_code, command)),
+                "error",
+            )
+        return return_code
+
     def console_print(self, msg, type="normal"):
-        self.console.emit(msg, type)
+        self.console.write(msg, type)
 
     def stop(self):
-        self.terminate()
+        """Terminates running commands and drops waiting ones"""
+
+        self.requestInterruption()
+        self.close()
+        with self.lock:
+            for proc in self.procs:
+                if proc.poll() is None:
+                    proc.terminate()
@@ -0,0 +1,104 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import threading
+
+from ..utils.cancellation import Canceled
+from ..utils.preview import build_strip
+from ..utils.preview import detect_slices
+from PySide6.QtCore import QThread
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QImage
+
+
+class PreviewThread(QThread):
+    """Detects slice points of a chapter preview strip in the background
+
+    The strip of a chapter is built once for its width params and kept, later
+    requests only run detection on it. A request replaces the pending one, and
+    a request made stale by a newer one is canceled or its result dropped.
+    """
+
+    stripReady = Signal(QImage, float)
+    slicesReady = Signal(list)
+    exceptionRaised = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.condition = threading.Condition()
+        self.pending = None
+        self.generation = 0
+        self.strip_key = None
+        self.strip = None
+        self.scale = 1.0
+
+    def request(self, kwargs: dict[str, any]):
+        """Previews `stitchtoon.process` kwargs, safe to call from any thread"""
+
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, kwargs)
+            self.condition.notify()
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self.generation or self.isInterruptionRequested()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.isInterruptionRequested():
+                    self.condition.wait()
+                if self.isInterruptionRequested():
+                    return
+                generation, kwargs = self.pending
+                self.pending = None
+            try:
+                self.preview(generation, kwargs)
+            except Canceled:
+                pass
+            except Exception as e:
+                if not self.is_stale(generation):
+                    self.exceptionRaised.emit(str(e))
+
+    def preview(self, generation: int, kwargs: dict[str, any]):
+        from stitchtoon import scan
+        from stitchtoon.utils.constants import DETECTION_TYPE
+
+        params = kwargs["params"]
+        image_dirs = scan(kwargs["input"], kwargs["recursive"])
+        if not image_dirs:
+            raise Exception("Didn't find any supported images")
+        paths = [image.path for image in image_dirs[0].images]
+        key = (tuple(paths), params["width_enforce"], params["custom_width"])
+        if key != self.strip_key:
+            self.strip_key = None
+            self.strip, self.scale = build_strip(
+                paths,
+                params["width_enforce"],
+                params["custom_width"],
+                is_canceled=lambda: self.is_stale(generation),
+            )
+            self.strip_key = key
+            width, height = self.strip.size
+            image = QImage(
+                self.strip.tobytes(), width, height, width * 3, QImage.Format_RGB888
+            )
+            self.stripReady.emit(image.copy(), self.scale)
+
+        if self.is_stale(generation):
+            return
+        split_height = kwargs["split_height"]
+        if kwargs["images_number"]:
+            split_height = self.strip.height / self.scale / kwargs["images_number"]
+            params = {
+                **params,
+                "detection_type": DETECTION_TYPE.NO_DETECTION.value,
+            }
+        points = detect_slices(self.strip, self.scale, params, split_height)
+        if not self.is_stale(generation):
+            self.slicesReady.emit(points)
+
+    def stop(self):
+        self.requestInterruption()
+        with self.condition:
+            self.condition.notify()
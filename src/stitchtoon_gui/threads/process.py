@@ -1,10 +1,20 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+import gc
+import json
 
+from ..utils.batch import process_parallel
+from ..utils.cancellation import Canceled
+from ..utils.cancellation import CancellationToken
+from ..utils.cancellation import remove_new_outputs
+from ..utils.cancellation import snapshot_outputs
+from ..utils.pipeline import run_pipeline
+from ..utils.stats import files_size
+from ..utils.stats import images_size
 from PySide6.QtCore import QThread
 from PySide6.QtCore import Signal
-from stitchtoon import process
+from stitchtoon.services.global_logger import Logger
 from stitchtoon.services.global_logger import logFunc
 from stitchtoon.utils.errors import EmptyImageDir
 from stitchtoon.utils.errors import SizeLimitError
@@ -12,25 +22,62 @@ from stitchtoon.utils.errors import SizeLimitError
 
 class ProcessThread(QThread):
     finished = Signal(bool)
+    canceled = Signal()
+    statsReady = Signal(dict)
+    chapterDone = Signal(str)
     exceptionRaised = Signal(Exception)
 
-    def __init__(self, params, parent=None):
+    def __init__(self, params, workers=1, token=None, parent=None):
         super().__init__(parent)
         self.params = params
+        self.workers = workers
+        self.token = token or CancellationToken()
 
     @logFunc(inclass=True)
     def run(self):
         success = False
+        snapshot = snapshot_outputs(self.params["output"])
         try:
-            process(**self.params)
+            bytes_read = images_size(
+                self.params["input"], self.params.get("recursive")
+            )
+            # chapterDone is emitted for each chapter as soon as it is written
+            if self.params.get("recursive") and self.workers > 1:
+                process_parallel(
+                    self.params,
+                    self.workers,
+                    progress=self.params.get("progress"),
+                    token=self.token,
+                    on_chapter=self.chapterDone.emit,
+                )
+            else:
+                run_pipeline(
+                    self.params, token=self.token, on_chapter=self.chapterDone.emit
+                )
+        except Canceled:
+            remove_new_outputs(self.params["output"], snapshot)
+            self.canceled.emit()
         except (EmptyImageDir, SizeLimitError, FileNotFoundError) as e:
             self.exceptionRaised.emit(str(e))
         except Exception as e:
             self.exceptionRaised.emit(str(e))
         else:
             success = True
+            self.emit_stats(bytes_read, files_size(self.params["output"], snapshot))
         finally:
+            # drops images of a canceled or failed run right away
+            gc.collect()
             self.finished.emit(success)
 
+    def emit_stats(self, bytes_read, bytes_written):
+        stats = getattr(self.params.get("progress"), "stats", None)
+        if stats is None:
+            return
+        record = stats.finish(bytes_read, bytes_written)
+        Logger.info(f"run stats: {json.dumps(record)}")
+        self.statsReady.emit(record)
+
     def stop(self):
-        self.terminate()
+        """Asks the run to stop at the next image or slice"""
+
+        self.token.cancel()
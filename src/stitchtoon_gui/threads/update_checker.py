@@ -2,6 +2,7 @@
 # License: MIT, see the file "LICENSE" for details.
 
 from .. import __version__
+from ..utils.constants import UPDATE_CHECK_TIMEOUT
 from PySide6.QtCore import QThread
 from PySide6.QtCore import Signal
 
@@ -21,7 +22,10 @@ class UpdateCheckThread(QThread):
                 "stitchtoon-gui",
                 "BishrGhalil",
                 default=("", "0.0.0"),
+                timeout=UPDATE_CHECK_TIMEOUT,
             )
+            if self.isInterruptionRequested():
+                return 0
             if parse_version(str(remote_version[1])) > parse_version(str(__version__)):
                 self.updateAvailable.emit(
                     remote_version[1],
@@ -33,4 +37,6 @@ class UpdateCheckThread(QThread):
             return 0
 
     def stop(self):
-        self.terminate()
+        """Drops the check result, a pending request ends within its timeout"""
+
+        self.requestInterruption()
@@ -0,0 +1,193 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Parallel batch mode, stitches every chapter of a batch in its own process"""
+
+import os
+import os.path as osp
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from multiprocessing import Manager
+from queue import Empty
+
+from .cancellation import Canceled
+from .cancellation import CancellationToken
+from .constants import DEFAULT_WORKERS
+from .constants import PROGRESS_RATE
+from .stats import RunStats
+from .throttle import Throttle
+
+
+# Seconds between merging chapters progress
+PROGRESS_INTERVAL = 0.1
+
+
+class QueueProgress:
+    """Progress handler forwarding a chapter progress through a queue
+
+    Updates also feed `stats`, the worker side record of the chapter.
+    """
+
+    def __init__(self, queue, chapter: int, token=None, rate=PROGRESS_RATE):
+        self.prefix = ""
+        self.size = 100
+        self._value = 0
+        self.queue = queue
+        self.chapter = chapter
+        self.token = token
+        self.throttle = Throttle(rate)
+        self.stats = RunStats()
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    def update(self, value, msg=""):
+        if self.token:
+            self.token.raise_if_canceled()
+        self._value = value
+        self.stats.update(value, msg)
+        # every put is a round trip to the manager process
+        if self.throttle(force=value >= self.size):
+            self.queue.put((self.chapter, value))
+
+    def start(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+def chapter_outputs(output: str) -> list[str]:
+    """Returns names written to a chapter output directory, none for an archive"""
+
+    if not osp.isdir(output):
+        return []
+    return sorted(name for name in os.listdir(output) if not name.startswith("."))
+
+
+def run_chapter(
+    kwargs: dict[str, any], chapter: int, queue, token=None
+) -> dict[str, any]:
+    """Stitches one chapter in a worker process, returns its `RunStats` record"""
+
+    from .pipeline import run_pipeline
+
+    progress = QueueProgress(queue, chapter, token)
+    run_pipeline({**kwargs, "progress": progress}, token)
+    return progress.stats.finish()
+
+
+def process_parallel(
+    kwargs: dict[str, any],
+    workers: int,
+    progress=None,
+    token=None,
+    on_chapter=None,
+) -> None:
+    """Runs `stitchtoon.process` batch mode with a worker process per chapter
+
+    Args:
+        kwargs (dict[str, any]): `stitchtoon.process` kwargs
+        workers (int): maximum number of worker processes
+        progress (ProgressHandler, optional): merged progress handler
+        token (CancellationToken, optional): stops all chapters when canceled
+        on_chapter (callable, optional): called with the output of each chapter
+            as soon as it is written
+
+    Raises:
+        EmptyImageDir: When input directory does not contain supported images
+        Canceled: When token is canceled, after running chapters stop
+        Exception: When one chapter or more failed, after all chapters finish
+    """
+
+    from stitchtoon.services.progressbar import ProgressHandler
+
+    from .manifest import skip_unchanged
+    from .pipeline import plan_chapters
+
+    progress = progress or ProgressHandler()
+    token = token or getattr(progress, "token", None)
+    stats = getattr(progress, "stats", None)
+    # workers get one chapter each, the manifest is only kept here
+    manifest, chapters = skip_unchanged(kwargs, plan_chapters(kwargs))
+    if not chapters:
+        progress.update(100, "Up to date")
+        progress.finish()
+        return
+
+    progress.update(0, "Stitching")
+    kwargs = {key: value for key, value in kwargs.items() if key != "progress"}
+    values = [0] * len(chapters)
+    errors = []
+    with Manager() as manager, ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(chapters)))
+    ) as executor:
+        updates = manager.Queue()
+        # worker processes can't see the caller token, they get a shared one
+        shared_token = CancellationToken(manager.Event())
+        futures = {}
+        for index, chapter in enumerate(chapters):
+            chapter_kwargs = {
+                **kwargs,
+                "input": chapter.input,
+                "output": chapter.output,
+                "recursive": False,
+                "skip_unchanged": False,
+                # worker processes share the cores for encoding
+                "encode_workers": max(1, DEFAULT_WORKERS // workers),
+            }
+            future = executor.submit(
+                run_chapter, chapter_kwargs, index, updates, shared_token
+            )
+            futures[future] = chapter
+
+        pending = set(futures)
+        while pending:
+            if token and token.is_canceled() and not shared_token.is_canceled():
+                shared_token.cancel()
+                for future in pending:
+                    future.cancel()
+            done, pending = wait(pending, timeout=PROGRESS_INTERVAL)
+            for future in done:
+                if future.cancelled() or isinstance(future.exception(), Canceled):
+                    continue
+                chapter = futures[future]
+                if future.exception():
+                    name = osp.basename(chapter.input)
+                    errors.append(f"{name}: {future.exception()}")
+                    continue
+                if stats is not None:
+                    stats.add(future.result())
+                if manifest:
+                    manifest.record(chapter, chapter_outputs(chapter.output))
+                if on_chapter:
+                    on_chapter(chapter.output)
+
+            try:
+                while True:
+                    index, value = updates.get_nowait()
+                    values[index] = value
+            except Empty:
+                pass
+
+            finished = len(futures) - len(pending)
+            try:
+                progress.update(
+                    int(sum(values) / len(values)),
+                    f"Stitched {finished}/{len(chapters)} chapters",
+                )
+            except Canceled:
+                # workers are stopped at the top of the loop
+                continue
+
+    if token:
+        token.raise_if_canceled()
+    if errors:
+        raise Exception("\n".join(errors))
+
+    progress.update(100, "Completed")
+    progress.finish()
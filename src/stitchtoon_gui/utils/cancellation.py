@@ -0,0 +1,72 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Cooperative cancellation of stitching runs"""
+
+import os
+import os.path as osp
+import shutil
+import threading
+
+
+class Canceled(Exception):
+    pass
+
+
+class CancellationToken:
+    """Cancellation flag checked by progress handlers between images and slices
+
+    Args:
+        event (optional): an Event like object, pass a `multiprocessing` manager
+            Event to share the token with worker processes.
+    """
+
+    def __init__(self, event=None):
+        self.event = event or threading.Event()
+
+    def cancel(self) -> None:
+        self.event.set()
+
+    def is_canceled(self) -> bool:
+        return self.event.is_set()
+
+    def raise_if_canceled(self) -> None:
+        if self.event.is_set():
+            raise Canceled("Canceled")
+
+
+def snapshot_outputs(output: os.PathLike) -> set[str]:
+    """Returns paths existing under output, None if output does not exist"""
+
+    if not osp.lexists(output):
+        return None
+    if not osp.isdir(output):
+        return {osp.abspath(output)}
+
+    paths = set()
+    for root, dirs, files in os.walk(output):
+        for name in dirs + files:
+            paths.add(osp.abspath(osp.join(root, name)))
+    return paths
+
+
+def remove_new_outputs(output: os.PathLike, snapshot: set[str]) -> None:
+    """Removes files and directories created under output after snapshot"""
+
+    if snapshot is None:
+        if osp.isdir(output):
+            shutil.rmtree(output, ignore_errors=True)
+        elif osp.lexists(output):
+            os.remove(output)
+        return
+    if not osp.isdir(output):
+        return
+
+    for root, dirs, files in os.walk(output, topdown=False):
+        for name in files:
+            path = osp.abspath(osp.join(root, name))
+            if path not in snapshot:
+                os.remove(path)
+        for name in dirs:
+            path = osp.abspath(osp.join(root, name))
+            if path not in snapshot and not os.listdir(path):
+                os.rmdir(path)
@@ -1,6 +1,7 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+import os
 from enum import Enum
 
 
@@ -16,8 +17,44 @@ THEMES = (
     "Light Pink",
     "Light Teal",
 )
+DEFAULT_WORKERS = os.cpu_count() or 1
 LOG_REL_DIR = "__logs__"
 SOURCE_CODE_LINK = "https://github.com/BishrGhalil/stitchtoon-gui"
+# Seconds
+UPDATE_CHECK_TIMEOUT = 10
+# Maximum progress bar updates per second
+PROGRESS_RATE = 20
+# Milliseconds settings wait for writes to settle before writing to disk
+SETTINGS_FLUSH_DELAY = 500
+# Post process output lines kept in the console, older ones are only in the log
+CONSOLE_LINES = 5000
+# Maximum post process console updates per second
+CONSOLE_RATE = 30
+# Milliseconds the preview waits for option changes to settle
+PREVIEW_DELAY = 150
+# Parts waiting between two pipeline stages, each holds one slice or its rows
+PIPELINE_QUEUE_SIZE = 1
+# Bytes of slice points kept in the detection cache, oldest used are dropped
+DETECTION_CACHE_SIZE = 16 * 1024 * 1024
+# Source file digests kept in the detection cache, oldest used are dropped
+DETECTION_CACHE_FILES = 100_000
+# Bytes images decoded ahead of the one being stitched may take
+PREFETCH_MEMORY = 512 * 1024 * 1024
+# Output extensions written as a single archive instead of a directory
+ARCHIVE_EXTENSIONS = (".zip", ".cbz")
+# Slice formats compressed already, archived as they are instead of deflated
+STORED_FORMATS = ("jpeg", "jpg", "webp", "png")
+# Suffix of archives being written, renamed to the output once complete
+PARTIAL_SUFFIX = ".part"
+# Detection type of the vectorized pixel comparison, next to stitchtoon ones
+VECTORIZED_DETECTION = "vectorized"
+# Pixels between neighbours compared when ruling out rows of a strip
+DETECTION_DOWNSAMPLE = 4
+# Strip rows converted and compared at once by vectorized detection
+DETECTION_BAND_ROWS = 256
+
+
+Profile = dict[str, any]
 
 
 class SPLIT_METHOD(Enum):
@@ -25,6 +62,17 @@ class SPLIT_METHOD(Enum):
     IMAGES_NUMBER = 1
 
 
+class WORKER_TYPE(Enum):
+    THREADS = "threads"
+    PROCESSES = "processes"
+
+
+class POSTPROCESS_SCOPE(Enum):
+    OUTPUT = "output"
+    CHAPTER = "chapter"
+    FILE = "file"
+
+
 DEFAULT_PROFILES = {
     "WebToon To Edit": {
         "name": "WebToon To Edit",
@@ -40,6 +88,10 @@ DEFAULT_PROFILES = {
         "ignorablePixels": 20,
         "batchMode": False,
         "exportArchive": False,
+        "skipUnchanged": True,
+        "memoryLimit": 1024,
+        "prefetchImages": 4,
+        "memoryMap": 512,
         "enablePostProcess": False,
         "matchSource": False,
         "writeMetadata": True,
@@ -58,6 +110,10 @@ DEFAULT_PROFILES = {
         "ignorablePixels": 20,
         "batchMode": False,
         "exportArchive": True,
+        "skipUnchanged": True,
+        "memoryLimit": 0,
+        "prefetchImages": 4,
+        "memoryMap": 512,
         "enablePostProcess": False,
         "matchSource": False,
         "writeMetadata": False,
@@ -76,6 +132,10 @@ DEFAULT_PROFILES = {
         "ignorablePixels": 20,
         "batchMode": False,
         "exportArchive": False,
+        "skipUnchanged": True,
+        "memoryLimit": 1024,
+        "prefetchImages": 4,
+        "memoryMap": 512,
         "enablePostProcess": False,
         "matchSource": False,
         "writeMetadata": True,
@@ -94,6 +154,10 @@ DEFAULT_PROFILES = {
         "ignorablePixels": 20,
         "batchMode": False,
         "exportArchive": True,
+        "skipUnchanged": True,
+        "memoryLimit": 0,
+        "prefetchImages": 4,
+        "memoryMap": 512,
         "enablePostProcess": False,
         "matchSource": True,
         "writeMetadata": False,
@@ -0,0 +1,111 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Vectorized pixel comparison detection
+
+Finds the same slice points as stitchtoon `PixelComparisonDetector`, comparing
+whole bands of rows at once instead of pixel by pixel. Bands are converted to
+grayscale when the scan first reaches them, a strip is never converted whole.
+
+Rows are first ruled out on every `DETECTION_DOWNSAMPLE`th pixel: neighbours
+there are that many pixels apart, so a row within the threshold at full
+resolution is within that many thresholds on them. Rows left are checked at
+full resolution.
+"""
+
+import numpy as np
+
+from .constants import DETECTION_BAND_ROWS
+from .constants import DETECTION_DOWNSAMPLE
+from .constants import VECTORIZED_DETECTION
+
+
+def max_row_diffs(pixels, step: int = 1):
+    """Returns the largest neighbour difference of every row of pixels"""
+
+    diffs = np.abs(np.diff(pixels[:, ::step].astype(np.int16), axis=1))
+    return diffs.max(axis=1, initial=0)
+
+
+def sliceable_rows(
+    strip, top: int, threshold: int, ignorable_pixels: int, rows: int
+) -> np.ndarray:
+    """Returns which strip rows from top can be sliced at
+
+    Args:
+        strip (PIL.Image): combined strip
+        top (int): first row of the band
+        threshold (int): largest neighbour difference of a sliceable row
+        ignorable_pixels (int): pixels ignored on both sides of a row
+        rows (int): band height
+
+    Returns:
+        numpy.ndarray: a bool for each row of the band
+    """
+
+    width, height = strip.size
+    band = strip.crop((0, top, width, min(top + rows, height))).convert("L")
+    pixels = np.asarray(band)[:, ignorable_pixels : width - ignorable_pixels]
+    step = DETECTION_DOWNSAMPLE
+    sliceable = max_row_diffs(pixels, step) <= threshold * step
+    sliceable[sliceable] = max_row_diffs(pixels[sliceable]) <= threshold
+    return sliceable
+
+
+class VectorizedPixelDetector:
+    """`PixelComparisonDetector` comparing rows as numpy operations"""
+
+    def run(self, combined_img, **kwargs) -> list[int]:
+        from stitchtoon.utils.constants import SMALLER_ALLOWED_HEIGHT
+
+        split_height = kwargs.get("split_height")
+        if not split_height or split_height < SMALLER_ALLOWED_HEIGHT:
+            raise Exception("Height very small to slice")
+        strip = combined_img.pil
+        scan_step = kwargs.get("scan_step", 5)
+        ignorable_pixels = kwargs.get("ignorable_pixels", 0)
+        sensitivity = kwargs.get("sensitivity", 90)
+        threshold = int(255 * (1 - (sensitivity / 100)))
+        last_row = strip.height
+        bands = {}
+
+        def can_slice(row):
+            band, offset = divmod(row, DETECTION_BAND_ROWS)
+            if band not in bands:
+                bands[band] = sliceable_rows(
+                    strip,
+                    band * DETECTION_BAND_ROWS,
+                    threshold,
+                    ignorable_pixels,
+                    DETECTION_BAND_ROWS,
+                )
+            return bands[band][offset]
+
+        slice_locations = [0]
+        row = split_height
+        move_up = True
+        while row < last_row:
+            if can_slice(row):
+                slice_locations.append(row)
+                row += split_height
+                move_up = True
+                continue
+            if row - slice_locations[-1] <= 0.4 * split_height:
+                row = slice_locations[-1] + split_height
+                move_up = False
+            if move_up:
+                row -= scan_step
+                continue
+            row += scan_step
+        if slice_locations[-1] != last_row - 1:
+            slice_locations.append(last_row - 1)
+        return slice_locations
+
+
+def select_detector(detection_type: str):
+    """Returns stitchtoon detector of detection_type, or the vectorized one"""
+
+    from stitchtoon.detectors import select_detector
+
+    if detection_type == VECTORIZED_DETECTION:
+        return VectorizedPixelDetector()
+    return select_detector(detection_type)
@@ -0,0 +1,169 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Slice points cached by the images and params they were detected with
+
+Re-running a chapter with only encoding changes (format, quality, archive)
+finds its slice points here instead of scanning the strip again. Entries are
+dropped least recently used first once the cache grows past its size.
+
+Sources are keyed by their content, which is only read again when their size
+or modification time changed, as the output manifest does.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .constants import DETECTION_CACHE_FILES
+from .constants import DETECTION_CACHE_SIZE
+from .constants import VECTORIZED_DETECTION
+from .manifest import file_hash
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    key TEXT PRIMARY KEY,
+    points TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS points_used ON points(used);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_used ON files(used);
+"""
+# stitch params the strip and its slice points depend on
+KEY_PARAMS = (
+    "detection_type",
+    "sensitivity",
+    "line_steps",
+    "ignorable_pixels",
+    "width_enforce",
+    "custom_width",
+)
+
+
+def detection_key(
+    sources: list[str], params: dict[str, any], split_height, digests=None
+) -> str:
+    """Hashes source files content along with detection params
+
+    Args:
+        digests (list[str]): `file_hash` of every source when known already
+    """
+
+    from stitchtoon.utils.constants import DETECTION_TYPE
+
+    digest = hashlib.sha1()
+    for file_digest in digests or map(file_hash, sources):
+        digest.update(file_digest.encode())
+    key_params = {name: params.get(name) for name in KEY_PARAMS}
+    # both pixel comparison engines find the same points
+    if key_params["detection_type"] == VECTORIZED_DETECTION:
+        key_params["detection_type"] = DETECTION_TYPE.PIXEL_COMPARISON.value
+    key_params["split_height"] = split_height
+    digest.update(json.dumps(key_params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    """Size bounded LRU cache of slice points in a SQLite file
+
+    Safe to share between threads, and between processes through the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int = DETECTION_CACHE_SIZE,
+        files: int = DETECTION_CACHE_FILES,
+    ):
+        self.path = path
+        self.size = size
+        self.files = files
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def key(self, sources: list[str], params: dict[str, any], split_height) -> str:
+        """Returns the `detection_key` of sources, hashing only changed ones"""
+
+        return detection_key(sources, params, split_height, self.digests(sources))
+
+    def digests(self, sources: list[str]) -> list[str]:
+        """Returns `file_hash` of sources, known ones by their size and mtime"""
+
+        stats = [os.stat(path) for path in sources]
+        with self.lock, self.db:
+            known = {
+                path: (size, mtime, digest)
+                for path, size, mtime, digest in self.db.execute(
+                    "SELECT path, size, mtime, digest FROM files WHERE path IN "
+                    f"({', '.join('?' * len(sources))})",
+                    sources,
+                )
+            }
+        digests = []
+        for path, stat in zip(sources, stats):
+            size, mtime, digest = known.get(path, (None, None, None))
+            if (size, mtime) != (stat.st_size, stat.st_mtime_ns):
+                digest = file_hash(path)
+            digests.append(digest)
+        # files are hashed out of the lock, other threads keep their lookups
+        with self.lock, self.db:
+            now = time.time()
+            self.db.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime, digest, used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (path, stat.st_size, stat.st_mtime_ns, digest, now)
+                    for path, stat, digest in zip(sources, stats, digests)
+                ],
+            )
+            self.db.execute(
+                "DELETE FROM files WHERE path IN (SELECT path FROM files "
+                "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.files,),
+            )
+        return digests
+
+    def get(self, key: str) -> list[int]:
+        """Returns cached slice points, None when missing"""
+
+        with self.lock, self.db:
+            row = self.db.execute(
+                "SELECT points FROM points WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE points SET used = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, points: list[int]) -> None:
+        body = json.dumps(points)
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO points (key, points, size, used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, body, len(body), time.time()),
+            )
+            # drops the oldest entries that don't fit once newer ones are kept
+            self.db.execute(
+                "DELETE FROM points WHERE key IN (SELECT key FROM ("
+                "SELECT key, SUM(size) OVER (ORDER BY used DESC) AS total "
+                "FROM points) WHERE total > ?)",
+                (self.size,),
+            )
+
+    def close(self) -> None:
+        self.db.close()
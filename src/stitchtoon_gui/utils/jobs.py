@@ -0,0 +1,49 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+
+
+class JOB_STATUS(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass(eq=False)
+class Job:
+    input: str
+    output: str
+    profile: dict[str, any]
+    status: JOB_STATUS = field(default=JOB_STATUS.QUEUED)
+    error: str = field(default="")
+    attempts: int = field(default=0)
+
+    def __str__(self):
+        text = f"[{self.status.value}] {self.input} ({self.profile['name']})"
+        if self.error:
+            text += f": {self.error}"
+        return text
+
+
+def run_job(kwargs: dict[str, any], token=None) -> None:
+    """Runs a job in a pool worker, kept light so process workers import fast
+
+    Raises:
+        Canceled: When token is canceled, after removing what the job wrote
+    """
+
+    from .cancellation import Canceled
+    from .cancellation import remove_new_outputs
+    from .cancellation import snapshot_outputs
+    from .pipeline import run_pipeline
+
+    snapshot = snapshot_outputs(kwargs["output"])
+    try:
+        run_pipeline(kwargs, token=token)
+    except Canceled:
+        remove_new_outputs(kwargs["output"], snapshot)
+        raise
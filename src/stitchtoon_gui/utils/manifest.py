@@ -0,0 +1,161 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Manifest of chapters written to an output, so re-runs skip unchanged ones
+
+A chapter is up to date when its output is still there, it was written with
+the same process kwargs, and its source files did not change. Sources are
+compared by size and modification time first, and by content only when the
+modification time moved.
+"""
+
+import hashlib
+import json
+import os
+import os.path as osp
+
+from .constants import ARCHIVE_EXTENSIONS
+
+
+MANIFEST_FILENAME = ".stitchtoon_manifest.json"
+MANIFEST_VERSION = 1
+# process kwargs that don't change what a run writes
+IGNORED_KWARGS = (
+    "input",
+    "output",
+    "progress",
+    "skip_unchanged",
+    "detection_cache",
+    "memory_limit",
+    "prefetch",
+    "memory_map",
+    "encode_workers",
+)
+HASH_CHUNK = 1024 * 1024
+
+
+def profile_hash(kwargs: dict[str, any]) -> str:
+    """Hashes process kwargs a chapter output depends on"""
+
+    effective = {
+        key: value for key, value in kwargs.items() if key not in IGNORED_KWARGS
+    }
+    return hashlib.sha1(
+        json.dumps(effective, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def file_hash(path: os.PathLike) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as fd:
+        while chunk := fd.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Chapters written to output with the kwargs hashed to profile
+
+    Args:
+        output (str): run output, the manifest is kept in it, or next to it
+            when output is an archive
+        profile (str): `profile_hash` of the run kwargs
+    """
+
+    def __init__(self, output: str, profile: str):
+        self.directory = output
+        if osp.splitext(output)[1].lower() in ARCHIVE_EXTENSIONS:
+            self.directory = osp.dirname(output)
+        self.path = osp.join(self.directory, MANIFEST_FILENAME)
+        self.profile = profile
+        self.chapters = {}
+        self.changed = False
+        try:
+            with open(self.path, encoding="utf-8") as fd:
+                data = json.load(fd)
+            if data.get("version") == MANIFEST_VERSION:
+                self.chapters = data["chapters"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def key(self, chapter) -> str:
+        return osp.relpath(chapter.output, self.directory or ".")
+
+    def is_up_to_date(self, chapter) -> bool:
+        """Checks a chapter against its record, refreshing moved timestamps"""
+
+        record = self.chapters.get(self.key(chapter))
+        if (
+            not record
+            or record["profile"] != self.profile
+            or not osp.exists(chapter.output)
+            or not all(
+                osp.exists(osp.join(chapter.output, name))
+                for name in record["outputs"]
+            )
+        ):
+            return False
+
+        files = record["files"]
+        if sorted(files) != sorted(osp.basename(path) for path in chapter.sources):
+            return False
+        for path in chapter.sources:
+            size, mtime, digest = files[osp.basename(path)]
+            stat = os.stat(path)
+            if stat.st_size != size:
+                return False
+            if stat.st_mtime_ns != mtime:
+                if file_hash(path) != digest:
+                    return False
+                files[osp.basename(path)][1] = stat.st_mtime_ns
+                self.changed = True
+        return True
+
+    def record(self, chapter, outputs: list[str]) -> None:
+        """Records a written chapter and saves the manifest
+
+        Args:
+            chapter (Chapter): written chapter
+            outputs (list[str]): names written in the chapter output directory,
+                empty for an archive
+        """
+
+        files = {}
+        for path in chapter.sources:
+            stat = os.stat(path)
+            files[osp.basename(path)] = [
+                stat.st_size,
+                stat.st_mtime_ns,
+                file_hash(path),
+            ]
+        self.chapters[self.key(chapter)] = {
+            "input": chapter.input,
+            "profile": self.profile,
+            "files": files,
+            "outputs": outputs,
+        }
+        self.save()
+
+    def save(self) -> None:
+        """Writes the manifest, replacing the old one at once"""
+
+        os.makedirs(self.directory or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fd:
+            json.dump({"version": MANIFEST_VERSION, "chapters": self.chapters}, fd)
+        os.replace(tmp, self.path)
+        self.changed = False
+
+
+def skip_unchanged(kwargs: dict[str, any], chapters: list) -> tuple[Manifest, list]:
+    """Returns the output manifest and chapters that are not up to date
+
+    The manifest is None when `skip_unchanged` kwarg is off.
+    """
+
+    if not kwargs.get("skip_unchanged"):
+        return None, chapters
+    manifest = Manifest(kwargs["output"], profile_hash(kwargs))
+    chapters = [chapter for chapter in chapters if not manifest.is_up_to_date(chapter)]
+    if manifest.changed:
+        manifest.save()
+    return manifest, chapters
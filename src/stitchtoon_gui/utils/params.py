@@ -0,0 +1,59 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+from .constants import DEFAULT_WORKERS
+from .constants import SPLIT_METHOD
+from .constants import Profile
+
+
+def get_split_method(profile: Profile) -> SPLIT_METHOD:
+    """Returns profile split method as a SPLIT_METHOD member"""
+
+    return SPLIT_METHOD[profile["splitMethod"].upper().replace(" ", "_")]
+
+
+def make_stitch_params(profile: Profile) -> dict[str, any]:
+    """Creates `stitch` params out of a profile"""
+
+    return {
+        "detection_type": profile["detectionType"].lower(),
+        "sensitivity": int(profile["sensitivity"]),
+        "custom_width": int(profile["widthEnforcementFixedValue"]),
+        "width_enforce": profile["widthEnforcement"],
+        "line_steps": int(profile["lineSteps"]),
+        "ignorable_pixels": int(profile.get("ignorablePixels")),
+    }
+
+
+def make_process_kwargs(
+    profile: Profile, input: str, output: str, progress=None
+) -> dict[str, any]:
+    """Creates `stitchtoon.process` kwargs out of a profile"""
+
+    from .settings import detection_cache_path
+
+    split_method = get_split_method(profile)
+    return {
+        "input": input,
+        "output": output,
+        "split_height": int(
+            profile["splitValue"] if split_method == SPLIT_METHOD.SPLIT_HEIGHT else 0
+        ),
+        "images_number": int(
+            profile["splitValue"] if split_method == SPLIT_METHOD.IMAGES_NUMBER else 0
+        ),
+        "output_format": profile["outputFormat"],
+        "recursive": bool(profile["batchMode"]),
+        "as_archive": bool(profile["exportArchive"]),
+        "lossy_quality": int(profile["lossyQuality"]),
+        "progress": progress,
+        "slice_to_metadata": bool(profile["matchSource"]),
+        "write_metadata": bool(profile["writeMetadata"]),
+        "skip_unchanged": bool(profile.get("skipUnchanged", True)),
+        "memory_limit": int(profile.get("memoryLimit", 0)) * 1024 * 1024,
+        "prefetch": int(profile.get("prefetchImages", 0)),
+        "memory_map": int(profile.get("memoryMap", 0)) * 1024 * 1024,
+        "encode_workers": DEFAULT_WORKERS,
+        "params": make_stitch_params(profile),
+        "detection_cache": detection_cache_path(),
+    }
@@ -0,0 +1,758 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Stitching run split in stages connected by bounded queues
+
+    load/detect/slice -> encode -> archive -> on_chapter (post process)
+
+Every stage runs in its own thread on one chapter at a time, so a chapter is
+detected while the previous one is encoded and the one before it is written.
+Queue sizes cap how many parts wait between stages and a part holds a single
+slice. A slice of a whole chapter strip is only cut when it is encoded, so a
+run holds one strip and the slices being encoded. Chapters
+whose strip is bigger than the `memory_limit` kwarg are never combined whole
+and stream, see `utils/streaming.py`. With the `prefetch`
+kwarg, that many images are decoded ahead on a thread pool, see
+`utils/prefetch.py`. Strips are pasted in place into one buffer sized from
+image headers, mapped to a temporary file when bigger than the `memory_map`
+kwarg. Outputs are named the way `stitchtoon.process` names them.
+With the `skip_unchanged` kwarg, chapters up to date in the output manifest are
+skipped, see `utils/manifest.py`, and with the `detection_cache` kwarg pixel
+detection results are reused, see `utils/detection_cache.py`.
+"""
+
+import gc
+import io
+import json
+import os
+import os.path as osp
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from queue import Empty
+from queue import Full
+from queue import Queue
+
+import numpy as np
+
+from .cancellation import Canceled
+from .constants import ARCHIVE_EXTENSIONS
+from .constants import PARTIAL_SUFFIX
+from .constants import PIPELINE_QUEUE_SIZE
+from .constants import STORED_FORMATS
+from .constants import VECTORIZED_DETECTION
+from .detection import select_detector
+from .detection_cache import DetectionCache
+from .manifest import skip_unchanged
+from .prefetch import Prefetcher
+from .prefetch import image_sizes
+from .preview import resized_sizes
+from .streaming import STRIP_PIXEL_BYTES
+from .streaming import StripWindow
+from .streaming import expected_slices
+from .streaming import select_cuts
+from .streaming import stream_slices
+from .streaming import strip_bytes
+
+
+# Share of the progress bar each stage fills, scan is done before stages start
+PROGRESS_PERCENTAGE = {
+    "scan": 10,
+    "load": 10,
+    "detect": 50,
+    "encode": 20,
+    "write": 10,
+}
+# Seconds a blocked stage waits before checking whether the run stopped
+POLL_INTERVAL = 0.1
+
+
+@dataclass(eq=False)
+class Chapter:
+    input: str
+    output: str
+    images: list
+    format: str
+    # files the chapter output depends on, its images and metadata file
+    sources: list[str] = field(default_factory=list)
+    metadata: dict[str, any] = field(default_factory=dict)
+    slice_points: list[int] = field(default_factory=list)
+    # slices count, estimated while the chapter streams
+    slices_len: int = 0
+    # open output archive and files written so far
+    archive: any = field(default=None)
+    outputs: list[str] = field(default_factory=list)
+
+
+@dataclass(eq=False)
+class Part:
+    """Slices of a chapter passed from a stage to the next"""
+
+    chapter: Chapter
+    # number of the first slice of the part
+    index: int = 1
+    # stitchtoon images, or `StripSlice`s of a whole strip
+    images: list = field(default_factory=list)
+    # encoded slices as they are being encoded, then as they are written
+    futures: list[Future] = field(default_factory=list)
+    slices: list[tuple[str, bytes]] = field(default_factory=list)
+    last: bool = True
+
+
+class SharedProgress:
+    """Adds stages progress up into one progress handler, safe from any thread
+
+    With a token, stages stop at their next image or slice once it is canceled.
+    """
+
+    def __init__(self, handler, token=None):
+        self.handler = handler
+        self.token = token
+        self.lock = threading.Lock()
+        self.value = 0
+
+    def advance(self, amount, msg=""):
+        if self.token:
+            self.token.raise_if_canceled()
+        with self.lock:
+            self.value = min(self.value + amount, 100)
+            self.handler.update(self.value, msg)
+
+
+class StageProgress:
+    """Progress handler given to stitchtoon calls made by one stage"""
+
+    def __init__(self, shared: SharedProgress):
+        self.shared = shared
+        self.prefix = ""
+        self.size = 100
+        self._value = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    def update(self, value, msg=""):
+        amount = value - self._value
+        self._value = value
+        self.shared.advance(amount, msg)
+
+    def start(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+def output_format(format: str, size: int) -> str:
+    """Returns the format stitchtoon saves slices of size with, or raises"""
+
+    from stitchtoon.utils.constants import FORMAT_NAME_MAPPER
+    from stitchtoon.utils.constants import FORMAT_SIZE_MAPPER
+    from stitchtoon.utils.constants import SIZE_LIMITS
+    from stitchtoon.utils.errors import SizeLimitError
+
+    format = format.lower()
+    format = FORMAT_NAME_MAPPER.get(format, format)
+    if FORMAT_SIZE_MAPPER.get(format) and size > SIZE_LIMITS[format]:
+        format = FORMAT_SIZE_MAPPER[format]
+    if size > SIZE_LIMITS[format]:
+        raise SizeLimitError(
+            f"Image type {format} supports size up to {SIZE_LIMITS[format]}px only"
+        )
+    return format
+
+
+def encode_image(pil, format: str, quality: int) -> bytes:
+    """Encodes a slice the way `Image.save` saves it, runs on encoder workers"""
+
+    from stitchtoon.services.image_directory import Image
+
+    buffer = io.BytesIO()
+    Image(path="", name="", pil=pil).save(buffer, format, quality)
+    return buffer.getvalue()
+
+
+def new_strip(width: int, height: int, memory_map: int = 0):
+    """Returns a blank RGBA strip whose pixels live in a numpy buffer
+
+    Strips bigger than memory_map bytes are backed by a temporary file, so their
+    pages are written out under memory pressure instead of swapped.
+    """
+
+    from PIL import Image
+
+    shape = (height, width, STRIP_PIXEL_BYTES)
+    if memory_map and width * height * STRIP_PIXEL_BYTES > memory_map:
+        with tempfile.TemporaryFile(prefix="stitchtoon-") as fd:
+            buffer = np.memmap(fd, dtype=np.uint8, mode="w+", shape=shape)
+    else:
+        buffer = np.zeros(shape, dtype=np.uint8)
+    strip = Image.frombuffer("RGBA", (width, height), buffer, "raw", "RGBA", 0, 1)
+    # buffer images are read only, pasting would copy them out of the buffer
+    strip.readonly = False
+    return strip
+
+
+@dataclass(eq=False)
+class StripSlice:
+    """Rows of a combined strip, only cut once the slice is encoded"""
+
+    strip: any
+    upper: int
+    lower: int
+
+    def cut(self):
+        """Returns the slice the way `ImageManipulator.slice` cuts it"""
+
+        from stitchtoon.services.image_directory import Image
+        from stitchtoon.utils.errors import SizeLimitError
+
+        strip = self.strip
+        try:
+            piece = strip.pil.crop((0, self.upper, strip.width, self.lower))
+            bbox = piece.getbbox()
+            if bbox:
+                piece = piece.crop(bbox)
+        except ValueError:
+            raise SizeLimitError("Images to small to slice")
+        return Image(path=strip.path, format=strip.format, name=strip.name, pil=piece)
+
+
+def strip_slices(strip, slice_points: list[int]):
+    """Yields slices of a combined strip, skipping points out of order"""
+
+    for upper, lower in zip(slice_points, slice_points[1:]):
+        if lower >= upper:
+            yield StripSlice(strip, upper, lower)
+
+
+def plan_chapters(kwargs: dict[str, any]) -> list[Chapter]:
+    """Scans input for chapters, raises what `stitchtoon.process` raises"""
+
+    from stitchtoon import scan
+    from stitchtoon.utils.constants import METADATA_FILENAME
+    from stitchtoon.utils.constants import PHOTOSHOP_FILE_TYPES
+    from stitchtoon.utils.errors import EmptyImageDir
+
+    input, output = kwargs["input"], kwargs["output"]
+    recursive, as_archive = kwargs["recursive"], kwargs["as_archive"]
+    if (
+        not kwargs["split_height"]
+        and not kwargs["images_number"]
+        and not kwargs["slice_to_metadata"]
+    ):
+        raise Exception(
+            "split_height, images_number and slice_to_metadata are not provided, "
+            "Must provide one of them"
+        )
+    format = output_format(
+        kwargs["output_format"],
+        max(kwargs["split_height"], kwargs["params"].get("custom_width", 0)),
+    )
+    if as_archive and format in PHOTOSHOP_FILE_TYPES:
+        raise Exception("Can't make PSD archive")
+    if not osp.lexists(input):
+        raise FileNotFoundError(f"Could not found {input}")
+    if not output:
+        raise Exception("Output path is not provided")
+
+    image_dirs = scan(input, recursive)
+    if not image_dirs:
+        raise EmptyImageDir(
+            "Didn't find any supported images. Try again with batch mode."
+        )
+
+    chapters = []
+    for image_dir in image_dirs:
+        sources = [image.path for image in image_dir.images]
+        metadata_path = osp.join(image_dir.path, METADATA_FILENAME)
+        if kwargs["slice_to_metadata"] and osp.isfile(metadata_path):
+            sources.append(metadata_path)
+        chapter_output = output
+        to_archive = osp.splitext(output)[1].lower() in ARCHIVE_EXTENSIONS
+        if recursive:
+            chapter_output = osp.join(output, osp.basename(image_dir.path))
+            if as_archive and not to_archive:
+                chapter_output += ".zip"
+        elif as_archive and not to_archive:
+            chapter_output = osp.join(output, f"{osp.basename(image_dir.path)}.zip")
+        chapters.append(
+            Chapter(image_dir.path, chapter_output, image_dir.images, format, sources)
+        )
+    return chapters
+
+
+class Pipeline:
+    """Runs `stitchtoon.process` kwargs as pipelined stages
+
+    Args:
+        kwargs (dict[str, any]): `stitchtoon.process` kwargs
+        token (CancellationToken, optional): stops all stages when canceled
+        on_chapter (callable, optional): called with the output of each chapter
+            as soon as it is written, from the archive stage thread
+        queue_size (int, optional): parts waiting between two stages
+    """
+
+    def __init__(
+        self,
+        kwargs: dict[str, any],
+        token=None,
+        on_chapter=None,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+    ):
+        from stitchtoon.services.progressbar import ProgressHandler
+
+        self.kwargs = kwargs
+        self.progress = kwargs.get("progress") or ProgressHandler()
+        self.token = token or getattr(self.progress, "token", None)
+        self.on_chapter = on_chapter
+        self.queue_size = max(1, queue_size)
+        self.shared = SharedProgress(self.progress, self.token)
+        self.stopped = threading.Event()
+        self.error = None
+        self.manifest = None
+        self.cache = None
+        self.prefetch = kwargs.get("prefetch", 0)
+        self.encode_workers = max(1, kwargs.get("encode_workers", 1))
+        self.encoders = {}
+        self.encoding = deque()
+        # seconds each stage spent working, waiting on queues left out
+        self.busy = {}
+
+    def run(self) -> None:
+        """Runs all chapters, raises the first error a stage hits
+
+        Raises:
+            FileNotFoundError: When input directory could not be found
+            EmptyImageDir: When input directory does not contain supported images
+            Canceled: When token is canceled, after stages stop
+        """
+
+        self.manifest, chapters = skip_unchanged(
+            self.kwargs, plan_chapters(self.kwargs)
+        )
+        if not chapters:
+            self.progress.update(100, "Up to date")
+            self.progress.finish()
+            return
+        self.share = 1 / len(chapters)
+        self.shared.advance(PROGRESS_PERCENTAGE["scan"], "Stitching")
+        if self.kwargs.get("detection_cache"):
+            self.cache = DetectionCache(self.kwargs["detection_cache"])
+
+        stages = (self.detect, self.encode, self.write)
+        queues = [Queue(self.queue_size) for _ in stages[1:]]
+        inboxes = [iter(chapters + [None])] + queues
+        outboxes = queues + [None]
+        threads = [
+            threading.Thread(
+                target=self.run_stage,
+                args=(stage, inbox, outbox),
+                name=f"pipeline-{stage.__name__}",
+                daemon=True,
+            )
+            for stage, inbox, outbox in zip(stages, inboxes, outboxes)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for encoder in self.encoders.values():
+            encoder.shutdown(wait=True, cancel_futures=True)
+        stats = getattr(self.progress, "stats", None)
+        if stats is not None:
+            stats.add_stages(self.busy)
+        if self.cache:
+            self.cache.close()
+        for chapter in chapters:
+            if chapter.archive is not None:
+                chapter.archive.close()
+                os.remove(chapter.archive.filename)
+
+        if self.error is not None:
+            raise self.error
+        self.progress.update(100, "Completed")
+        self.progress.finish()
+        gc.collect()
+
+    def run_stage(self, stage, inbox, outbox) -> None:
+        progress = StageProgress(self.shared)
+        self.busy[stage.__name__] = 0.0
+        try:
+            while True:
+                item = self.get(inbox)
+                if item is None:
+                    break
+                if self.token:
+                    self.token.raise_if_canceled()
+                for result in self.timed(stage.__name__, stage(item, progress)):
+                    if self.token:
+                        self.token.raise_if_canceled()
+                    if self.stopped.is_set():
+                        return
+                    if outbox is not None:
+                        self.put(outbox, result)
+                    elif self.on_chapter:
+                        self.on_chapter(result)
+            if outbox is not None:
+                self.put(outbox, None)
+        except Exception as e:
+            self.stop(e)
+
+    def timed(self, name: str, results):
+        """Yields stage results, adding the time taken by each to the stage"""
+
+        while True:
+            started = time.perf_counter()
+            try:
+                result = next(results)
+            except StopIteration:
+                return
+            finally:
+                self.busy[name] += time.perf_counter() - started
+            yield result
+
+    def get(self, inbox):
+        if not isinstance(inbox, Queue):
+            return None if self.stopped.is_set() else next(inbox)
+        while not self.stopped.is_set():
+            try:
+                return inbox.get(timeout=POLL_INTERVAL)
+            except Empty:
+                pass
+        return None
+
+    def put(self, outbox: Queue, part: Part) -> None:
+        while not self.stopped.is_set():
+            try:
+                return outbox.put(part, timeout=POLL_INTERVAL)
+            except Full:
+                pass
+
+    def stop(self, error: Exception) -> None:
+        """Keeps the first error and stops every stage"""
+
+        if self.error is None or (
+            isinstance(self.error, Canceled) and not isinstance(error, Canceled)
+        ):
+            self.error = error
+        self.stopped.set()
+
+    def detect(self, chapter: Chapter, progress: StageProgress):
+        """Loads chapter images, combines them and finds slice points
+
+        Yields a part for every slice once slice points of the whole strip are
+        known, or as soon as each is cut when the chapter streams.
+        """
+
+        from stitchtoon.utils.constants import DETECTION_TYPE
+        from stitchtoon.utils.constants import METADATA_FILENAME
+        from stitchtoon.utils.constants import WIDTH_ENFORCEMENT
+        from stitchtoon.utils.errors import NoMetadataError
+
+        kwargs = self.kwargs
+        params = dict(kwargs["params"])
+        split_height = kwargs["split_height"]
+        images_number = kwargs["images_number"]
+        prev_metadata = {}
+        using_metadata = False
+        if kwargs["slice_to_metadata"]:
+            metadata_path = osp.join(chapter.input, METADATA_FILENAME)
+            if osp.isfile(metadata_path):
+                using_metadata = True
+                with open(metadata_path) as fd:
+                    prev_metadata = json.load(fd)
+            elif not split_height and not images_number:
+                raise NoMetadataError(
+                    "metadata file does not exists, try stitching source again "
+                    "with write_metadata option, Or provide split_height or "
+                    "images_number"
+                )
+        if using_metadata:
+            params["detection_type"] = DETECTION_TYPE.METADATA.value
+            params["custom_width"] = -1
+            params["width_enforce"] = WIDTH_ENFORCEMENT.NONE.value
+        if kwargs["write_metadata"]:
+            params["width_enforce"] = WIDTH_ENFORCEMENT.NONE.value
+        if not chapter.images:
+            return
+
+        paths = [image.path for image in chapter.images]
+        sizes = image_sizes(paths, self.prefetch)
+        chapter.metadata = {"imgs": [list(size) for size in sizes]}
+        if images_number and not using_metadata:
+            split_height = sum(h for w, h in sizes) / images_number
+            chapter.format = output_format(chapter.format, split_height)
+            params["detection_type"] = DETECTION_TYPE.NO_DETECTION.value
+        resized = resized_sizes(sizes, params["width_enforce"], params["custom_width"])
+        images = Prefetcher(paths, sizes, self.prefetch)
+        if kwargs.get("memory_limit") and strip_bytes(resized) > kwargs["memory_limit"]:
+            yield from self.stream(
+                chapter, images, resized, params, split_height, prev_metadata, progress
+            )
+            return
+
+        strip = self.combine(chapter, images, resized, progress)
+        progress.update(progress.value, "Calculating slicing points")
+        key, points = self.cached_points(chapter, params, split_height)
+        if not points:
+            points = select_detector(params["detection_type"]).run(
+                combined_img=strip,
+                split_height=split_height,
+                sensitivity=params["sensitivity"],
+                ignorable_pixels=params["ignorable_pixels"],
+                scan_step=params["line_steps"],
+                metadata=prev_metadata.get("imgs"),
+            )
+            if key:
+                self.cache.put(key, points)
+        chapter.slice_points = points
+        slices = list(strip_slices(strip, points))
+        chapter.slices_len = len(slices)
+        # slices are cut as they are encoded, queued parts only hold row ranges
+        yield from self.parts(chapter, slices, progress)
+
+    def combine(
+        self,
+        chapter: Chapter,
+        images: Prefetcher,
+        sizes: list[tuple[int, int]],
+        progress: StageProgress,
+    ):
+        """Resizes and combines images like `ImageManipulator`, one at a time
+
+        Images are pasted in place into a strip allocated once from sizes.
+
+        Returns:
+            stitchtoon.services.image_directory.Image: combined strip
+        """
+
+        from PIL import Image as pilImage
+        from stitchtoon.services.image_directory import Image
+
+        first = chapter.images[0]
+        chapter.images = []
+        images_len = len(images)
+        load_increment = PROGRESS_PERCENTAGE["load"] * self.share / images_len
+        increment = PROGRESS_PERCENTAGE["detect"] * self.share / images_len
+        strip = new_strip(
+            max(w for w, h in sizes),
+            sum(h for w, h in sizes),
+            self.kwargs.get("memory_map", 0),
+        )
+        offset = 0
+        for idx, (image, size) in enumerate(zip(images, sizes), 1):
+            progress.update(
+                progress.value + load_increment, f"Loading {idx}/{images_len}"
+            )
+            with image:
+                if image.size != size:
+                    image = image.resize(size, pilImage.Resampling.LANCZOS)
+                strip.paste(image, (0, offset))
+            offset += size[1]
+            progress.update(progress.value + increment, f"Combined {idx}/{images_len}")
+        return Image(path=first.path, format=first.format, name=first.name, pil=strip)
+
+    def stream(
+        self,
+        chapter: Chapter,
+        images: Prefetcher,
+        sizes: list[tuple[int, int]],
+        params: dict[str, any],
+        split_height,
+        prev_metadata: dict[str, any],
+        progress: StageProgress,
+    ):
+        """Yields a part for every chapter slice as soon as it is cut"""
+
+        chapter.images = []
+        window = StripWindow(
+            images,
+            sizes,
+            progress=progress,
+            increment=PROGRESS_PERCENTAGE["load"] * self.share / len(images),
+        )
+        chapter.slices_len = expected_slices(window.height, split_height)
+        increment = PROGRESS_PERCENTAGE["detect"] * self.share / chapter.slices_len
+        key, cached = self.cached_points(chapter, params, split_height)
+        cuts = cached or select_cuts(params["detection_type"])(
+            window,
+            split_height=split_height,
+            sensitivity=params["sensitivity"],
+            ignorable_pixels=params["ignorable_pixels"],
+            scan_step=params["line_steps"],
+            metadata=prev_metadata.get("imgs"),
+        )
+
+        def recorded(cuts):
+            for point in cuts:
+                chapter.slice_points.append(point)
+                yield point
+            if key and not cached:
+                self.cache.put(key, chapter.slice_points)
+
+        slices = stream_slices(window, recorded(cuts), chapter.input, chapter.format)
+        yield from self.parts(chapter, slices, progress, increment)
+
+    def parts(self, chapter: Chapter, slices, progress: StageProgress, increment=0):
+        """Yields a part for every slice, holding it back to mark the last one"""
+
+        part = None
+        for index, image in enumerate(slices, 1):
+            if part:
+                yield part
+            part = Part(chapter, index, [image], last=False)
+            progress.update(progress.value + increment, f"Slicing {index}")
+        if part is None:
+            part = Part(chapter)
+        part.last = True
+        chapter.slices_len = part.index
+        yield part
+
+    def cached_points(self, chapter: Chapter, params: dict[str, any], split_height):
+        """Returns the detection cache key of chapter and its cached points"""
+
+        from stitchtoon.utils.constants import DETECTION_TYPE
+
+        if not self.cache or params["detection_type"] not in (
+            DETECTION_TYPE.PIXEL_COMPARISON.value,
+            VECTORIZED_DETECTION,
+        ):
+            return None, []
+        key = self.cache.key(chapter.sources, params, split_height)
+        return key, self.cache.get(key) or []
+
+    def encoder(self, format: str):
+        """Returns the pool slices of format are encoded on, None encodes inline
+
+        Photoshop files are encoded by psd_tools in python, holding the GIL, so
+        they get worker processes, other formats are encoded by Pillow.
+        """
+
+        from stitchtoon.utils.constants import PHOTOSHOP_FILE_TYPES
+
+        if self.encode_workers <= 1:
+            return None
+        processes = format in PHOTOSHOP_FILE_TYPES
+        if processes not in self.encoders:
+            executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            self.encoders[processes] = executor(self.encode_workers)
+        return self.encoders[processes]
+
+    def submit(self, pil, format: str) -> Future:
+        encoder = self.encoder(format)
+        if encoder is not None:
+            return encoder.submit(
+                encode_image, pil, format, self.kwargs["lossy_quality"]
+            )
+        future = Future()
+        future.set_result(encode_image(pil, format, self.kwargs["lossy_quality"]))
+        return future
+
+    def encode(self, part: Part, progress: StageProgress):
+        """Sends part slices to the encoders
+
+        Parts are yielded in order as soon as their slices are encoded, up to
+        `encode_workers` slices of the following parts are encoded meanwhile.
+        """
+
+        chapter = part.chapter
+        for image in part.images:
+            if isinstance(image, StripSlice):
+                image = image.cut()
+            part.futures.append(self.submit(image.pil, chapter.format))
+        part.images = []
+        self.encoding.append(part)
+        while self.encoding and (
+            part.last
+            or sum(len(queued.futures) for queued in self.encoding)
+            > self.encode_workers
+        ):
+            yield self.encoded(self.encoding.popleft(), progress)
+
+    def encoded(self, part: Part, progress: StageProgress) -> Part:
+        """Waits for part slices, in order, and names them by their index"""
+
+        chapter = part.chapter
+        slices_len = max(chapter.slices_len, part.index + len(part.futures) - 1)
+        increment = PROGRESS_PERCENTAGE["encode"] * self.share / max(slices_len, 1)
+        for idx, future in enumerate(part.futures, part.index):
+            part.slices.append((f"{idx:02}.{chapter.format}", future.result()))
+            progress.update(progress.value + increment, f"Encoding {idx}/{slices_len}")
+        part.futures = []
+        return part
+
+    def write(self, part: Part, progress: StageProgress):
+        """Writes encoded slices to the chapter directory or archive
+
+        Archive entries are written as soon as their part arrives, to a partial
+        file renamed to the output once the last part is in. Yields the chapter
+        output then.
+        """
+
+        import zipfile
+
+        from stitchtoon.utils.constants import METADATA_FILENAME
+
+        chapter = part.chapter
+        slices_len = max(chapter.slices_len, part.index + len(part.slices) - 1)
+        increment = PROGRESS_PERCENTAGE["write"] * self.share / max(slices_len, 1)
+        if self.kwargs["as_archive"]:
+            if chapter.archive is None:
+                os.makedirs(osp.dirname(chapter.output) or ".", exist_ok=True)
+                chapter.archive = zipfile.ZipFile(
+                    chapter.output + PARTIAL_SUFFIX, "w"
+                )
+            compress_type = zipfile.ZIP_DEFLATED
+            if chapter.format in STORED_FORMATS:
+                compress_type = zipfile.ZIP_STORED
+            for idx, (name, data) in enumerate(part.slices, part.index):
+                chapter.archive.writestr(name, data, compress_type)
+                progress.update(
+                    progress.value + increment, f"Archive {idx}/{slices_len}"
+                )
+        else:
+            os.makedirs(chapter.output, exist_ok=True)
+            for idx, (name, data) in enumerate(part.slices, part.index):
+                with open(osp.join(chapter.output, name), "wb") as fd:
+                    fd.write(data)
+                chapter.outputs.append(name)
+                progress.update(
+                    progress.value + increment, f"Saving {idx}/{slices_len}"
+                )
+        part.slices = []
+        if not part.last:
+            return
+
+        if chapter.archive is not None:
+            chapter.archive.close()
+            os.replace(chapter.archive.filename, chapter.output)
+            chapter.archive = None
+        elif not self.kwargs["as_archive"] and self.kwargs["write_metadata"]:
+            progress.update(progress.value, "Writing metadata file")
+            with open(osp.join(chapter.output, METADATA_FILENAME), "w") as fd:
+                json.dump(chapter.metadata, fd)
+        if self.manifest:
+            self.manifest.record(chapter, chapter.outputs)
+        yield chapter.output
+
+
+def run_pipeline(
+    kwargs: dict[str, any],
+    token=None,
+    on_chapter=None,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+) -> None:
+    """Runs `stitchtoon.process` kwargs through a `Pipeline`"""
+
+    Pipeline(kwargs, token, on_chapter, queue_size).run()
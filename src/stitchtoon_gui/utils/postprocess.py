@@ -0,0 +1,79 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Post process commands, expanded once, per chapter or per output file"""
+
+import os
+import os.path as osp
+import shlex
+import subprocess
+import sys
+
+from .constants import POSTPROCESS_SCOPE
+
+
+def get_scope(args: str) -> POSTPROCESS_SCOPE:
+    """Returns the scope a post process args placeholders ask for"""
+
+    if "$file" in args:
+        return POSTPROCESS_SCOPE.FILE
+    if "$chapter" in args:
+        return POSTPROCESS_SCOPE.CHAPTER
+    return POSTPROCESS_SCOPE.OUTPUT
+
+
+def quote(path: str) -> str:
+    if sys.platform == "win32":
+        return subprocess.list2cmdline([path])
+    return shlex.quote(path)
+
+
+def make_command(cmd: str, args: str, **paths: str) -> str:
+    """Makes a shell command replacing `$name` placeholders with quoted paths"""
+
+    cmd = " ".join(shlex.split(cmd))
+    args = " ".join(shlex.split(args))
+    # longest first so `$file` can't eat a longer name starting with it
+    for name in sorted(paths, key=len, reverse=True):
+        args = args.replace(f"${name}", quote(paths[name]))
+    return f"{cmd.strip()} {args.strip()}"
+
+
+def target_files(target: str) -> list[str]:
+    """Returns files written to a chapter output, the archive itself for one"""
+
+    if not osp.isdir(target):
+        return [target] if osp.isfile(target) else []
+    files = []
+    for root, dirs, names in os.walk(target):
+        dirs.sort()
+        # skips metadata and other hidden files
+        files.extend(
+            osp.join(root, name) for name in sorted(names) if not name.startswith(".")
+        )
+    return files
+
+
+def expand_commands(
+    cmd: str, args: str, input: str, output: str, target: str
+) -> list[tuple[str, str]]:
+    """Returns (label, command) pairs to run for a target
+
+    Output scope has one unlabeled command, target being the whole output.
+    """
+
+    scope = get_scope(args)
+    paths = {"input": input, "output": output}
+    if scope == POSTPROCESS_SCOPE.OUTPUT:
+        return [("", make_command(cmd, args, **paths))]
+
+    chapter = osp.basename(target)
+    if scope == POSTPROCESS_SCOPE.CHAPTER:
+        return [(chapter, make_command(cmd, args, **paths, chapter=target))]
+
+    return [
+        (
+            osp.relpath(file, osp.dirname(target)),
+            make_command(cmd, args, **paths, chapter=target, file=file),
+        )
+        for file in target_files(target)
+    ]
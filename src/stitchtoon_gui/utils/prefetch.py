@@ -0,0 +1,88 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Chapter images decoded ahead of the one being stitched, on a thread pool
+
+Reading and decoding release the GIL, so the next images are read while the
+current one is resized and combined. Images decoded ahead and not used yet are
+kept under a memory budget, estimated from their header sizes.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import PREFETCH_MEMORY
+from .preview import open_image
+from .streaming import STRIP_PIXEL_BYTES
+from .streaming import image_size
+
+
+def image_sizes(paths: list[str], workers: int = 1) -> list[tuple[int, int]]:
+    """Reads image sizes from their headers, on workers threads"""
+
+    if workers <= 1 or len(paths) <= 1:
+        return [image_size(path) for path in paths]
+    with ThreadPoolExecutor(min(workers, len(paths))) as executor:
+        return list(executor.map(image_size, paths))
+
+
+def decode(path: str):
+    image = open_image(path)
+    image.load()
+    return image
+
+
+class Prefetcher:
+    """Iterates over decoded images of paths in order
+
+    Args:
+        paths (list[str]): images to decode
+        sizes (list[tuple[int, int]]): image sizes, from their headers
+        depth (int, optional): images decoded ahead, 0 decodes each one when
+            it is reached. Defaults to 0.
+        budget (int, optional): bytes images decoded ahead may take, the next
+            image is always decoded. Defaults to PREFETCH_MEMORY.
+    """
+
+    def __init__(
+        self,
+        paths: list[str],
+        sizes: list[tuple[int, int]],
+        depth: int = 0,
+        budget: int = PREFETCH_MEMORY,
+    ):
+        self.paths = paths
+        self.sizes = sizes
+        self.depth = max(0, depth)
+        self.budget = budget
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        if not self.depth:
+            for path in self.paths:
+                yield decode(path)
+            return
+
+        executor = ThreadPoolExecutor(self.depth, thread_name_prefix="prefetch")
+        pending = deque()
+        held = 0
+        index = 0
+        try:
+            while index < len(self.paths) or pending:
+                while index < len(self.paths) and len(pending) < self.depth:
+                    width, height = self.sizes[index]
+                    size = width * height * STRIP_PIXEL_BYTES
+                    if pending and held + size > self.budget:
+                        break
+                    pending.append((executor.submit(decode, self.paths[index]), size))
+                    held += size
+                    index += 1
+                future, size = pending.popleft()
+                held -= size
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, size in pending:
+                if not future.cancelled() and future.exception() is None:
+                    future.result().close()
@@ -0,0 +1,142 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Downscaled chapter strips to preview slice detection on
+
+Detection params are scaled along with the strip, so cut lines land within a
+few pixels of where a full run puts them.
+"""
+
+from .cancellation import Canceled
+from .detection import select_detector
+
+
+# Width in pixels of preview strips, narrower chapters are not upscaled
+PREVIEW_WIDTH = 240
+
+
+def resized_sizes(
+    sizes: list[tuple[int, int]], width_enforce: str, custom_width: int
+) -> list[tuple[int, int]]:
+    """Returns image sizes after `ImageManipulator.resize`, without pixels"""
+
+    from stitchtoon.utils.constants import WIDTH_ENFORCEMENT
+
+    def resize(size, width):
+        if width <= 0 or size[0] == width:
+            return size
+        height = int(size[1] / size[0] * width)
+        return (width, height) if height > 0 else size
+
+    if width_enforce == WIDTH_ENFORCEMENT.NONE.value and not custom_width:
+        return sizes
+    if width_enforce == WIDTH_ENFORCEMENT.COPYWRITE.value:
+        if len(sizes) < 2:
+            return sizes
+        return [resize(sizes[0], sizes[1][0])] + sizes[1:]
+    if width_enforce == WIDTH_ENFORCEMENT.AUTO.value:
+        width = min(size[0] for size in sizes)
+    else:
+        width = custom_width
+    return [resize(size, width) for size in sizes]
+
+
+def open_image(path: str):
+    """Opens an image lazily, photoshop files are composed right away"""
+
+    from PIL import Image
+    from stitchtoon.utils.constants import PHOTOSHOP_FILE_TYPES
+
+    if path.rsplit(".", 1)[-1].lower() in PHOTOSHOP_FILE_TYPES:
+        from psd_tools import PSDImage
+
+        return PSDImage.open(path).topil()
+    return Image.open(path)
+
+
+def build_strip(
+    paths: list[str],
+    width_enforce: str,
+    custom_width: int,
+    width: int = PREVIEW_WIDTH,
+    is_canceled=None,
+):
+    """Combines downscaled images the way a run combines them
+
+    Args:
+        paths (list[str]): chapter images, in order
+        width_enforce (str): `stitch` width_enforce param
+        custom_width (int): `stitch` custom_width param
+        width (int, optional): strip width. Defaults to PREVIEW_WIDTH.
+        is_canceled (callable, optional): checked between images
+
+    Raises:
+        Canceled: When is_canceled returns True
+
+    Returns:
+        tuple[PIL.Image, float]: strip and its scale to the full size strip
+    """
+
+    from PIL import Image
+
+    images = [open_image(path) for path in paths]
+    try:
+        sizes = resized_sizes(
+            [image.size for image in images], width_enforce, custom_width
+        )
+        scale = min(1.0, width / max(size[0] for size in sizes))
+        thumb_sizes = [
+            (max(1, round(w * scale)), max(1, round(h * scale))) for w, h in sizes
+        ]
+        strip = Image.new(
+            "RGB",
+            (max(w for w, h in thumb_sizes), sum(h for w, h in thumb_sizes)),
+        )
+        offset = 0
+        for image, size in zip(images, thumb_sizes):
+            if is_canceled and is_canceled():
+                raise Canceled("Canceled")
+            # jpeg decoders can skip most of the pixels right away
+            image.draft("RGB", size)
+            thumb = image.convert("RGB").resize(
+                size, Image.Resampling.BILINEAR, reducing_gap=2.0
+            )
+            strip.paste(thumb, (0, offset))
+            offset += size[1]
+    finally:
+        for image in images:
+            image.close()
+    return strip, scale
+
+
+def detect_slices(
+    strip, scale: float, params: dict[str, any], split_height
+) -> list[int]:
+    """Runs detection on a preview strip with params scaled to it
+
+    Args:
+        strip (PIL.Image): `build_strip` strip
+        scale (float): `build_strip` scale
+        params (dict[str, any]): `stitch` params
+        split_height (int): full size split height
+
+    Returns:
+        list[int]: slice points on the preview strip
+    """
+
+    from stitchtoon.services.image_directory import Image
+    from stitchtoon.utils.constants import DETECTION_TYPE
+    from stitchtoon.utils.constants import SMALLER_ALLOWED_HEIGHT
+
+    detection_type = params["detection_type"]
+    if detection_type == DETECTION_TYPE.METADATA.value:
+        detection_type = DETECTION_TYPE.NO_DETECTION.value
+    image = Image(path="", name="preview")
+    image.pil = strip
+    return select_detector(detection_type).run(
+        combined_img=image,
+        split_height=max(int(split_height * scale), SMALLER_ALLOWED_HEIGHT),
+        sensitivity=params["sensitivity"],
+        ignorable_pixels=round(params["ignorable_pixels"] * scale),
+        scan_step=max(1, round(params["line_steps"] * scale)),
+        metadata=None,
+    )
@@ -0,0 +1,144 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Profiles stored one row each in a SQLite file, indexed by name and tags"""
+
+import json
+import os
+import sqlite3
+from collections.abc import Mapping
+
+from .constants import DEFAULT_PROFILES
+from .constants import Profile
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    name TEXT NOT NULL REFERENCES profiles(name) ON DELETE CASCADE,
+    tag TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (name, tag)
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags(tag);
+"""
+EXPORT_VERSION = 1
+
+
+class ProfileStore(Mapping):
+    """Read only mapping of profile name to profile, with write methods
+
+    Names and order are queried from the database, bodies are only parsed the
+    first time they are read.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+        self._bodies = {}
+
+    def __getitem__(self, name: str) -> Profile:
+        body = self._bodies.get(name)
+        if body is None:
+            row = self.db.execute(
+                "SELECT body FROM profiles WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(name)
+            body = self._bodies[name] = json.loads(row[0])
+        return body
+
+    def __contains__(self, name) -> bool:
+        return (
+            name in self._bodies
+            or self.db.execute(
+                "SELECT 1 FROM profiles WHERE name = ?", (name,)
+            ).fetchone()
+            is not None
+        )
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def names(self) -> list[str]:
+        rows = self.db.execute("SELECT name FROM profiles ORDER BY position")
+        return [name for name, in rows]
+
+    def search(self, text: str) -> list[str]:
+        """Returns names containing text or having a tag starting with it"""
+
+        text = text.strip()
+        if not text:
+            return self.names()
+        escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        rows = self.db.execute(
+            "SELECT name FROM profiles WHERE name LIKE ? ESCAPE '\\' "
+            "OR name IN (SELECT name FROM tags WHERE tag LIKE ? ESCAPE '\\') "
+            "ORDER BY position",
+            (f"%{escaped}%", f"{escaped}%"),
+        )
+        return [name for name, in rows]
+
+    def put(self, profile: Profile) -> None:
+        """Adds a profile, or replaces the one with the same name in place"""
+
+        name = profile["name"]
+        with self.db:
+            self.db.execute(
+                "INSERT INTO profiles (name, position, body) VALUES "
+                "(?, (SELECT IFNULL(MAX(position), -1) + 1 FROM profiles), ?) "
+                "ON CONFLICT(name) DO UPDATE SET body = excluded.body",
+                (name, json.dumps(profile)),
+            )
+            self.db.execute("DELETE FROM tags WHERE name = ?", (name,))
+            self.db.executemany(
+                "INSERT OR IGNORE INTO tags (name, tag) VALUES (?, ?)",
+                [(name, tag) for tag in profile.get("tags", ())],
+            )
+        self._bodies[name] = profile
+
+    def delete(self, name: str) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM profiles WHERE name = ?", (name,))
+        self._bodies.pop(name, None)
+
+    def clear(self) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM profiles")
+        self._bodies.clear()
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def read_profiles(path: os.PathLike) -> list[Profile]:
+    """Reads profiles exported by `write_profiles` or a single profile file
+
+    Missing fields are filled from the first default profile.
+    """
+
+    with open(path, encoding="utf-8") as fd:
+        data = json.load(fd)
+
+    profiles = data.get("profiles", [data]) if isinstance(data, dict) else data
+    if not isinstance(profiles, list) or not all(
+        isinstance(profile, dict) and profile.get("name") for profile in profiles
+    ):
+        raise ValueError(f"{path} is not a profiles file")
+
+    base = next(iter(DEFAULT_PROFILES.values()))
+    return [{**base, **profile} for profile in profiles]
+
+
+def write_profiles(path: os.PathLike, profiles: list[Profile]) -> None:
+    with open(path, "w", encoding="utf-8") as fd:
+        json.dump(
+            {"version": EXPORT_VERSION, "profiles": list(profiles)}, fd, indent=2
+        )
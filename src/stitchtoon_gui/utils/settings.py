@@ -1,41 +1,134 @@
 # This file is part of stitchtoon.
 # License: MIT, see the file "LICENSE" for details.
 
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from .constants import DEFAULT_PROFILES
+from .constants import DEFAULT_WORKERS
+from .constants import SETTINGS_FLUSH_DELAY
+from .constants import WORKER_TYPE
+from .constants import Profile
+from .profile_store import ProfileStore
+from PySide6.QtCore import QCoreApplication
 from PySide6.QtCore import QSettings
+from PySide6.QtCore import QStandardPaths
+from PySide6.QtCore import QTimer
 
 
-Profile = dict[str, any]
+_MISSING = object()
 
 
 class Settings(QSettings):
+    """QSettings keeping values in memory
+
+    Reads hit the disk once per key, writes mark their key dirty and dirty keys
+    are written together, off the GUI thread, once writes settle for
+    `SETTINGS_FLUSH_DELAY` ms. `sync` writes them right away.
+
+    Profiles live in a `ProfileStore` next to the other application data.
+    """
+
     default = {
         "current-profile": DEFAULT_PROFILES.get(list(DEFAULT_PROFILES.keys())[0]),
-        "profiles": DEFAULT_PROFILES,
         "theme": "dark_teal",
         "used-before": False,
+        "workers": DEFAULT_WORKERS,
+        "worker-type": WORKER_TYPE.THREADS.value,
+        "postprocess-workers": DEFAULT_WORKERS,
     }
 
     def __init__(self):
         super().__init__("stitchtoon", "stitchtoon")
-        if not self["used-before"] or not self["profiles"]:
+        self._cache = {}
+        self._dirty = set()
+        self._flush_timer = None
+        self._writer = ThreadPoolExecutor(1)
+        self._pending = None
+        self.profiles = ProfileStore(profiles_path())
+        self._migrate_profiles()
+        if not self["used-before"] or not self.profiles:
             self.reset()
             self["used-before"] = True
 
+    def _migrate_profiles(self):
+        """Moves profiles kept in QSettings by older versions to the store"""
+
+        if not self.contains("profiles"):
+            return
+        if not self.profiles:
+            for profile in (super().value("profiles") or {}).values():
+                self.profiles.put(profile)
+        self.remove("profiles")
+        super().sync()
+
     def reset(self):
+        self._cache.clear()
         for key, value in self.default.items():
-            self.setValue(key, value)
+            self.setValue(key, copy.deepcopy(value))
+        self.profiles.clear()
+        for profile in DEFAULT_PROFILES.values():
+            self.profiles.put(copy.deepcopy(profile))
         self.sync()
 
-    def get_profiles(self) -> dict[str, Profile]:
-        return self.get("profiles", self.default["profiles"])
+    def get_profiles(self) -> ProfileStore:
+        """Returns profiles as a read only mapping, bodies load on access"""
+
+        return self.profiles
 
     def get_profile(self, name: str = "") -> Profile:
         if isinstance(name, dict):
             name = name["name"]
-        if not name or not self.get_profiles().get(name):
-            return self.value("current-profile")
-        return self.get_profiles().get(name)
+        profile = self.get_profiles().get(name) if name else None
+        return profile or self.value("current-profile")
+
+    def value(self, key, default=None):
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            if not self.contains(key):
+                return default
+            value = self._cache[key] = super().value(key)
+        return value
+
+    def setValue(self, key, value):
+        cached = self._cache.get(key, _MISSING)
+        # the same object may have been changed in place, only equal copies skip
+        if cached is not value and cached == value:
+            return
+        self._cache[key] = value
+        self._dirty.add(key)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        # without an event loop the timer never fires, write through
+        if QCoreApplication.instance() is None:
+            self.flush(wait=True)
+            return
+        if self._flush_timer is None:
+            self._flush_timer = QTimer(self)
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.setInterval(SETTINGS_FLUSH_DELAY)
+            self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def flush(self, wait: bool = False):
+        """Writes dirty keys in the background, `wait` blocks until written"""
+
+        if self._flush_timer:
+            self._flush_timer.stop()
+        if self._dirty:
+            values = {key: copy.deepcopy(self._cache[key]) for key in self._dirty}
+            self._dirty.clear()
+            self._pending = self._writer.submit(
+                _write_settings, self.fileName(), self.format(), values
+            )
+        if wait and self._pending:
+            self._pending.result()
+
+    def sync(self):
+        self.flush(wait=True)
+        super().sync()
 
     def get(self, key, *args, **kwargs):
         return self.value(key, *args, **kwargs)
@@ -52,4 +145,44 @@ class Settings(QSettings):
         return cls.instance
 
 
+def data_dir(*parts: str) -> str:
+    """Returns a directory under the user data directory, creating it"""
+
+    directory = os.path.join(
+        QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation),
+        "stitchtoon",
+        *parts,
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def cache_dir(*parts: str) -> str:
+    """Returns a directory under the user cache directory, creating it"""
+
+    directory = os.path.join(
+        QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation),
+        "stitchtoon",
+        *parts,
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def profiles_path() -> str:
+    return os.path.join(data_dir(), "profiles.sqlite3")
+
+
+def detection_cache_path() -> str:
+    return os.path.join(cache_dir(), "detection.sqlite3")
+
+
+def _write_settings(path: str, format, values: dict[str, any]):
+    # QSettings is reentrant, not thread safe, so writers get their own
+    writer = QSettings(path, format)
+    for key, value in values.items():
+        writer.setValue(key, value)
+    writer.sync()
+
+
 settings = Settings()
@@ -0,0 +1,68 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Import time breakdown of the startup, see `--profile-startup`"""
+
+import builtins
+import sys
+import time
+
+
+class ImportProfiler:
+    """Times first imports of modules by wrapping `builtins.__import__`
+
+    Like `python -X importtime`, each module gets its own time (self) and its
+    time including the modules it imported (cumulative).
+    """
+
+    def __init__(self):
+        self.records = []
+        self.started = None
+        self._stack = []
+        self._original_import = None
+
+    def install(self) -> None:
+        self.started = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = _resolve(name, globals, level) if level else name
+        if module in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            self.records.append((module, cumulative - children, cumulative))
+
+    def report(self, file=None, limit: int = 25) -> None:
+        """Prints the slowest imports by cumulative time"""
+
+        file = file or sys.stderr
+        total = time.perf_counter() - self.started
+        print(f"startup: {total * 1000:.1f} ms", file=file)
+        print(f"{'self [ms]':>10} | {'cumulative [ms]':>15} | module", file=file)
+        records = sorted(self.records, key=lambda record: record[2], reverse=True)
+        for name, self_time, cumulative in records[:limit]:
+            print(
+                f"{self_time * 1000:>10.1f} | {cumulative * 1000:>15.1f} | {name}",
+                file=file,
+            )
+
+
+def _resolve(name, globals, level) -> str:
+    package = (globals or {}).get("__package__") or ""
+    parts = package.split(".")
+    base = ".".join(parts[: len(parts) - level + 1])
+    return f"{base}.{name}" if name else base
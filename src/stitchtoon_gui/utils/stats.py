@@ -0,0 +1,207 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Run instrumentation built out of stitchtoon progress updates
+
+Images and slices are counted from progress messages. Stage times are measured
+by the pipeline, see `Pipeline.run_stage`, as stages run at the same time on
+their own threads and their messages interleave.
+"""
+
+import os
+import os.path as osp
+import re
+import time
+
+
+# Pipeline stages, the detect stage also reads and decodes images
+STAGES = ("detect", "encode", "write")
+LOADED_IMAGE = re.compile(r"Loading \d+/\d+")
+SAVED_SLICE = re.compile(r"(Saving|Archive) \d+/\d+")
+# Weight of the newest sample in the progress rate moving average
+RATE_SMOOTHING = 0.2
+MB = 1024 * 1024
+
+
+class RunStats:
+    """Measures throughput, per stage timing and ETA of a run"""
+
+    def __init__(self, smoothing: float = RATE_SMOOTHING):
+        self.smoothing = smoothing
+        self.started = time.monotonic()
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.images = 0
+        self.slices = 0
+        self.rate = None
+        self._last = (self.started, 0)
+
+    def update(self, value, msg=""):
+        now = time.monotonic()
+        if LOADED_IMAGE.match(msg):
+            self.images += 1
+        elif SAVED_SLICE.match(msg):
+            self.slices += 1
+
+        last_time, last_value = self._last
+        if value > last_value and now > last_time:
+            rate = (value - last_value) / (now - last_time)
+            if self.rate is None:
+                self.rate = rate
+            else:
+                self.rate += self.smoothing * (rate - self.rate)
+            self._last = (now, value)
+
+    def add(self, record: dict[str, any]) -> None:
+        """Adds up the images, slices and stage times of a worker run record
+
+        Worker processes of a batch run measure their own chapters, the parent
+        only sees their merged progress.
+        """
+
+        self.images += record["images"]
+        self.slices += record["slices"]
+        self.add_stages(record["stages"])
+
+    def add_stages(self, stages: dict[str, float]) -> None:
+        """Adds busy seconds of each stage, measured by the stage thread"""
+
+        for stage, seconds in stages.items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def eta(self, value, size=100) -> float:
+        """Seconds left, None until progress moves"""
+
+        if not self.rate:
+            return None
+        return max(size - value, 0) / self.rate
+
+    def live(self, value, size=100) -> dict[str, any]:
+        """Figures to show while running"""
+
+        elapsed = self.elapsed
+        return {
+            "elapsed": elapsed,
+            "eta": self.eta(value, size),
+            "images_per_second": self.images / elapsed if elapsed else 0.0,
+        }
+
+    def finish(self, bytes_read: int = 0, bytes_written: int = 0) -> dict[str, any]:
+        """Closes the run and returns its record"""
+
+        elapsed = time.monotonic() - self.started
+        read_time = self.stages["detect"] or elapsed
+        write_time = self.stages["write"] or elapsed
+        return {
+            "elapsed": elapsed,
+            "images": self.images,
+            "slices": self.slices,
+            "images_per_second": self.images / elapsed if elapsed else 0.0,
+            "bytes_read": bytes_read,
+            "bytes_written": bytes_written,
+            "read_mb_per_second": bytes_read / MB / read_time if read_time else 0.0,
+            "written_mb_per_second": bytes_written / MB / write_time
+            if write_time
+            else 0.0,
+            "stages": dict(self.stages),
+        }
+
+
+class StatsProgress:
+    """Progress handler that measures, for headless runs
+
+    Args:
+        progress (ProgressHandler, optional): handler updates are passed on to,
+            like the progress bar of `--show-progress`
+    """
+
+    def __init__(self, prefix="", size=100, progress=None):
+        self.prefix = prefix
+        self.size = size
+        self.progress = progress
+        self.stats = RunStats()
+        self._value = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    def update(self, value, msg=""):
+        self._value = value
+        self.stats.update(value, msg)
+        if self.progress:
+            self.progress.update(value, msg)
+
+    def start(self):
+        if self.progress:
+            self.progress.start()
+
+    def finish(self):
+        if self.progress:
+            self.progress.finish()
+
+
+def files_size(path: os.PathLike, exclude: set[str] = None) -> int:
+    """Returns size in bytes of files under path, skipping `exclude` paths"""
+
+    if not osp.lexists(path):
+        return 0
+    if not osp.isdir(path):
+        return osp.getsize(path)
+
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            file_path = osp.abspath(osp.join(root, name))
+            if not exclude or file_path not in exclude:
+                size += osp.getsize(file_path)
+    return size
+
+
+def images_size(path: os.PathLike, recursive: bool) -> int:
+    """Returns size in bytes of supported images under path"""
+
+    from stitchtoon import scan
+
+    image_dirs = scan(path, recursive) if osp.isdir(path) else None
+    return sum(
+        osp.getsize(image.path)
+        for image_dir in image_dirs or ()
+        for image in image_dir.images
+    )
+
+
+def format_live(live: dict[str, any]) -> str:
+    """Formats `RunStats.live` figures for the progress bar"""
+
+    text = ""
+    if live["images_per_second"]:
+        text += f" | {live['images_per_second']:.1f} img/s"
+    if live["eta"] is not None:
+        text += f" | {format_seconds(live['eta'])} left"
+    return text
+
+
+def format_record(record: dict[str, any]) -> str:
+    """Formats a `RunStats.finish` record in one line"""
+
+    return (
+        f"Completed in {format_seconds(record['elapsed'])}, "
+        f"{record['images_per_second']:.1f} img/s, "
+        f"read {record['read_mb_per_second']:.1f} MB/s, "
+        f"written {record['written_mb_per_second']:.1f} MB/s"
+    )
+
+
+def format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+    return f"{minutes}:{seconds:02}"
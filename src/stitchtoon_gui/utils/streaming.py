@@ -0,0 +1,240 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Chapters stitched a window of rows at a time, for strips too big for memory
+
+Images are decoded one by one as detection reaches their rows, and rows are
+dropped as soon as the slice above them is cut, so memory holds about one
+slice and one image whatever the chapter length. Cut points and slices are
+the same as stitching the whole strip at once.
+"""
+
+import bisect
+import math
+
+import numpy as np
+
+from .constants import VECTORIZED_DETECTION
+
+
+# Bytes per pixel of a combined strip, it is RGBA
+STRIP_PIXEL_BYTES = 4
+
+
+def image_size(path: str) -> tuple[int, int]:
+    """Reads an image size from its header, without decoding pixels"""
+
+    from PIL import Image
+    from stitchtoon.utils.constants import PHOTOSHOP_FILE_TYPES
+
+    if path.rsplit(".", 1)[-1].lower() in PHOTOSHOP_FILE_TYPES:
+        from psd_tools import PSDImage
+
+        return PSDImage.open(path).size
+    with Image.open(path) as image:
+        return image.size
+
+
+def strip_bytes(sizes: list[tuple[int, int]]) -> int:
+    """Bytes a strip of images of sizes takes in memory"""
+
+    if not sizes:
+        return 0
+    return max(w for w, h in sizes) * sum(h for w, h in sizes) * STRIP_PIXEL_BYTES
+
+
+class StripWindow:
+    """Rows of a chapter strip, decoded image by image as they are needed
+
+    Args:
+        images (Iterable[PIL.Image]): decoded chapter images, in order
+        sizes (list[tuple[int, int]]): image sizes after width enforcement
+        progress (ProgressHandler, optional): updated for every loaded image
+        increment (float, optional): progress increment of an image
+    """
+
+    def __init__(self, images, sizes, progress=None, increment=0):
+        self.images = iter(images)
+        self.sizes = sizes
+        self.progress = progress
+        self.increment = increment
+        self.width = max(w for w, h in sizes)
+        self.height = sum(h for w, h in sizes)
+        self.loaded = 0
+        # rows of loaded and not dropped images, as (top, rgba, gray) bands
+        self.bands = []
+        self.tops = []
+        self.bottom = 0
+
+    def load_next(self) -> None:
+        from PIL import Image
+
+        size = self.sizes[self.loaded]
+        with next(self.images) as image:
+            if image.size != size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+            band = Image.new("RGBA", (self.width, size[1]))
+            band.paste(image, (0, 0))
+        self.bands.append((self.bottom, band, np.asarray(band.convert("L"))))
+        self.tops.append(self.bottom)
+        self.bottom += size[1]
+        self.loaded += 1
+        if self.progress:
+            self.progress.update(
+                self.progress.value + self.increment,
+                f"Loading {self.loaded}/{len(self.sizes)}",
+            )
+
+    def ensure(self, row: int) -> None:
+        """Loads images until row is in the window"""
+
+        while self.bottom <= row and self.loaded < len(self.sizes):
+            self.load_next()
+
+    def band(self, row: int):
+        return self.bands[bisect.bisect_right(self.tops, row) - 1]
+
+    def gray_row(self, row: int):
+        self.ensure(row)
+        top, band, gray = self.band(row)
+        return gray[row - top]
+
+    def crop(self, upper: int, lower: int):
+        """Returns strip rows from upper to lower as an RGBA image"""
+
+        from PIL import Image
+
+        self.ensure(min(lower, self.height) - 1)
+        strip = Image.new("RGBA", (self.width, lower - upper))
+        for top, band, gray in self.bands:
+            bottom = top + band.height
+            if bottom <= upper or top >= lower:
+                continue
+            piece = band.crop(
+                (0, max(upper, top) - top, self.width, min(lower, bottom) - top)
+            )
+            strip.paste(piece, (0, max(upper, top) - upper))
+        return strip
+
+    def drop(self, row: int) -> None:
+        """Drops images entirely above row"""
+
+        while self.bands and self.bands[0][0] + self.bands[0][1].height <= row:
+            self.bands.pop(0)
+            self.tops.pop(0)
+
+
+def pixel_cuts(window: StripWindow, **kwargs):
+    """Yields `PixelComparisonDetector` slice points, reading rows as needed"""
+
+    from stitchtoon.utils.constants import SMALLER_ALLOWED_HEIGHT
+
+    split_height = kwargs.get("split_height")
+    if not split_height or split_height < SMALLER_ALLOWED_HEIGHT:
+        raise Exception("Height very small to slice")
+    scan_step = kwargs.get("scan_step", 5)
+    ignorable_pixels = kwargs.get("ignorable_pixels", 0)
+    threshold = int(255 * (1 - (kwargs.get("sensitivity", 90) / 100)))
+    last_row = window.height
+
+    last_cut = 0
+    yield last_cut
+    row = split_height
+    move_up = True
+    while row < last_row:
+        pixels = window.gray_row(row)
+        pixels = pixels[ignorable_pixels : len(pixels) - ignorable_pixels]
+        if not np.any(np.abs(np.diff(pixels.astype(np.int16))) > threshold):
+            last_cut = row
+            yield last_cut
+            row += split_height
+            move_up = True
+            continue
+        if row - last_cut <= 0.4 * split_height:
+            row = last_cut + split_height
+            move_up = False
+        if move_up:
+            row -= scan_step
+            continue
+        row += scan_step
+    if last_cut != last_row - 1:
+        yield last_row - 1
+
+
+def direct_cuts(window: StripWindow, **kwargs):
+    """Yields `DirectSlicingDetector` slice points"""
+
+    from stitchtoon.utils.constants import SMALLER_ALLOWED_HEIGHT
+
+    split_height = kwargs.get("split_height")
+    if not split_height or split_height < SMALLER_ALLOWED_HEIGHT:
+        raise Exception("Height very small to slice")
+    last_cut = 0
+    yield last_cut
+    row = split_height
+    while row < window.height:
+        last_cut = row
+        yield last_cut
+        row += split_height
+    if last_cut != window.height - 1:
+        yield window.height - 1
+
+
+def metadata_cuts(window: StripWindow, **kwargs):
+    """Yields `MetadataSlicingDetector` slice points"""
+
+    from stitchtoon.utils.errors import NoMetadataError
+
+    metadata = kwargs.get("metadata")
+    if not metadata:
+        raise NoMetadataError
+    last_cut = 0
+    yield last_cut
+    for width, height in metadata:
+        if last_cut >= window.height:
+            break
+        last_cut += height
+        yield last_cut
+    if last_cut != window.height - 1:
+        yield window.height - 1
+
+
+def select_cuts(detection_type: str):
+    from stitchtoon.utils.constants import DETECTION_TYPE
+
+    if not detection_type or detection_type == DETECTION_TYPE.NO_DETECTION.value:
+        return direct_cuts
+    elif detection_type in (
+        DETECTION_TYPE.PIXEL_COMPARISON.value,
+        VECTORIZED_DETECTION,
+    ):
+        return pixel_cuts
+    elif detection_type == DETECTION_TYPE.METADATA.value:
+        return metadata_cuts
+    else:
+        raise Exception("Invalid Detection Type")
+
+
+def stream_slices(window: StripWindow, cuts, name: str = "", format: str = None):
+    """Yields slices as stitchtoon images as soon as their cut points are known
+
+    Slices are cut like `ImageManipulator.slice`, dropping rows behind them.
+    """
+
+    from stitchtoon.services.image_directory import Image
+
+    upper = None
+    for lower in cuts:
+        if upper is not None and lower >= upper:
+            piece = window.crop(round(upper), round(lower))
+            bbox = piece.getbbox()
+            if bbox:
+                piece = piece.crop(bbox)
+            window.drop(round(lower))
+            yield Image(path=name, name=name, format=format, pil=piece)
+        upper = lower
+
+
+def expected_slices(height: int, split_height) -> int:
+    """Estimates the slices count of a strip before its cut points are known"""
+
+    return max(1, math.ceil(height / split_height)) if split_height else 1
@@ -0,0 +1,19 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import time
+
+
+class Throttle:
+    """Lets calls through at most `rate` times per second, 0 lets all through"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0
+        self.last = 0.0
+
+    def __call__(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if force or now - self.last >= self.interval:
+            self.last = now
+            return True
+        return False
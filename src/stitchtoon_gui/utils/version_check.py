@@ -52,12 +52,14 @@ __repos = [
 ]
 
 
-def get_repo_version(package: str, org: str = "", default=None):
+def get_repo_version(package: str, org: str = "", default=None, timeout=None):
     for repo in __repos:
         if "org" in repo["needs"] and not org:
             continue
         res = requests.get(
-            repo["url"].format(package=package, org=org), headers=repo["headers"]
+            repo["url"].format(package=package, org=org),
+            headers=repo["headers"],
+            timeout=timeout,
         )
         if res.status_code == 200:
             json_res = res.json()
@@ -1,14 +1,23 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+from PyInstaller.utils.hooks import copy_metadata
 
 
 block_cipher = None
 
+# cached themes come from `make resources`, build them on a clean checkout
+if not os.path.isdir(os.path.join(SPECPATH, 'src', 'stitchtoon_gui', 'gui', 'resources', 'themes')):
+    subprocess.run([sys.executable, os.path.join(SPECPATH, 'scripts', 'build_resources.py')], check=True)
+
 
 a = Analysis(
     ['src\\stitchtoon-gui.py'],
     pathex=[],
     binaries=[],
-    datas=[('src\\stitchtoon_gui\\gui\\resources\\layout.ui', 'stitchtoon_gui\gui\\resources\\'), ('src\\stitchtoon_gui\\gui\\resources\\custom.css', 'stitchtoon_gui\gui\\resources\\')],
+    datas=[('src\\stitchtoon_gui\\gui\\resources\\layout.ui', 'stitchtoon_gui\gui\\resources\\'), ('src\\stitchtoon_gui\\gui\\resources\\custom.css', 'stitchtoon_gui\gui\\resources\\'), ('src\\stitchtoon_gui\\gui\\resources\\themes', 'stitchtoon_gui\\gui\\resources\\themes\\')] + copy_metadata('qt-material'),
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
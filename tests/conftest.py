@@ -0,0 +1,14 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+"""Tests run offscreen, with settings and data kept in a temporary home"""
+
+import os
+import tempfile
+
+
+HOME = tempfile.mkdtemp(prefix="stitchtoon-tests-")
+os.environ["HOME"] = HOME
+os.environ["XDG_CONFIG_HOME"] = os.path.join(HOME, ".config")
+os.environ["XDG_DATA_HOME"] = os.path.join(HOME, ".local", "share")
+os.environ["XDG_CACHE_HOME"] = os.path.join(HOME, ".cache")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,122 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import numpy as np
+import pytest
+
+from PIL import Image as PILImage
+from stitchtoon.detectors.pixel_comparison import PixelComparisonDetector
+from stitchtoon.services.image_directory import Image
+from stitchtoon_gui.utils.constants import DETECTION_BAND_ROWS
+from stitchtoon_gui.utils.constants import DETECTION_DOWNSAMPLE
+from stitchtoon_gui.utils.detection import VectorizedPixelDetector
+from stitchtoon_gui.utils.detection import sliceable_rows
+
+
+WIDTH = 120
+KINDS = ("noise", "flat", "ramp", "steep", "hidden")
+
+
+def threshold_of(sensitivity: int) -> int:
+    return int(255 * (1 - (sensitivity / 100)))
+
+
+def make_row(kind: str, threshold: int, rng) -> np.ndarray:
+    """Returns a grayscale row, sliceable for flat and ramp kinds only
+
+    Ramps go up and down `threshold` every pixel, so pixels `DETECTION_DOWNSAMPLE`
+    apart differ by exactly the prefilter bound. Steep ones differ by one more,
+    hidden ones by the bound too but with a neighbour difference of one more.
+    """
+
+    if kind == "noise":
+        return rng.integers(0, 256, WIDTH)
+    if kind == "flat":
+        return np.full(WIDTH, rng.integers(0, 256))
+    step = DETECTION_DOWNSAMPLE
+    rise = {
+        "ramp": [threshold] * step,
+        "steep": [threshold + 1] * step,
+        "hidden": [threshold + 1, threshold - 1] + [threshold] * (step - 2),
+    }[kind]
+    diffs = np.tile(rise + [-diff for diff in rise], WIDTH // (2 * step) + 1)
+    return np.concatenate(([0], np.cumsum(diffs)))[:WIDTH]
+
+
+def make_strip(height: int, sensitivity: int, seed: int, sliceable=()) -> Image:
+    """Returns a strip of random row kinds, sliceable at least at rows given"""
+
+    rng = np.random.default_rng(seed)
+    threshold = threshold_of(sensitivity)
+    kinds = rng.choice(KINDS, height, p=[0.6, 0.1, 0.1, 0.1, 0.1])
+    kinds[list(sliceable)] = "ramp"
+    pixels = np.stack([make_row(kind, threshold, rng) for kind in kinds])
+    pil = PILImage.fromarray(pixels.clip(0, 255).astype(np.uint8), "L")
+    return Image(path="", name="strip", pil=pil)
+
+
+def cut_points(detector, strip: Image, **kwargs) -> list[int]:
+    return detector.run(combined_img=strip, **kwargs)
+
+
+def test_prefilter_bound_rows():
+    for sensitivity in (75, 80, 90):
+        threshold = threshold_of(sensitivity)
+        rng = np.random.default_rng(sensitivity)
+        rows = np.stack([make_row(kind, threshold, rng) for kind in KINDS])
+        strip = PILImage.fromarray(rows.astype(np.uint8), "L")
+        assert sliceable_rows(strip, 0, threshold, 0, len(KINDS)).tolist() == [
+            False,
+            True,
+            True,
+            False,
+            False,
+        ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("sensitivity", (75, 90, 100))
+@pytest.mark.parametrize("ignorable_pixels", (0, 3, 20))
+@pytest.mark.parametrize("scan_step", (1, 5))
+def test_same_points_as_stitchtoon(seed, sensitivity, ignorable_pixels, scan_step):
+    seams = [
+        row + offset
+        for row in range(DETECTION_BAND_ROWS, 1400, DETECTION_BAND_ROWS)
+        for offset in (-1, 0, 1)
+    ]
+    strip = make_strip(1400, sensitivity, seed, [0, 1, 1398, 1399, *seams])
+    for split_height in (12, 90, DETECTION_BAND_ROWS, 300):
+        kwargs = {
+            "split_height": split_height,
+            "sensitivity": sensitivity,
+            "ignorable_pixels": ignorable_pixels,
+            "scan_step": scan_step,
+        }
+        assert cut_points(VectorizedPixelDetector(), strip, **kwargs) == cut_points(
+            PixelComparisonDetector(), strip, **kwargs
+        )
+
+
+@pytest.mark.parametrize("height", (1, 9, 90, DETECTION_BAND_ROWS + 1))
+def test_short_strips(height):
+    strip = make_strip(height, 90, height)
+    kwargs = {"split_height": 90, "sensitivity": 90, "scan_step": 5}
+    assert cut_points(VectorizedPixelDetector(), strip, **kwargs) == cut_points(
+        PixelComparisonDetector(), strip, **kwargs
+    )
+
+
+def test_color_strips():
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (600, WIDTH, 3), dtype=np.uint8)
+    pixels[::7] = rng.integers(0, 256, (1, 1, 3), dtype=np.uint8)
+    strip = Image(path="", name="strip", pil=PILImage.fromarray(pixels, "RGB"))
+    kwargs = {"split_height": 100, "sensitivity": 90, "scan_step": 5}
+    assert cut_points(VectorizedPixelDetector(), strip, **kwargs) == cut_points(
+        PixelComparisonDetector(), strip, **kwargs
+    )
+
+
+def test_too_small_split_height():
+    with pytest.raises(Exception, match="Height very small"):
+        VectorizedPixelDetector().run(combined_img=make_strip(20, 90, 0))
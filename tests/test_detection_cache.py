@@ -0,0 +1,152 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import json
+import os
+import threading
+
+import pytest
+
+from stitchtoon_gui.utils import detection_cache
+from stitchtoon_gui.utils.detection_cache import DetectionCache
+from stitchtoon_gui.utils.detection_cache import detection_key
+
+
+PARAMS = {"detection_type": "pixel", "sensitivity": 90, "line_steps": 5}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DetectionCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"{index:02}.png"
+        path.write_bytes(bytes([index]) * 256)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Paths `file_hash` read, through the detection cache"""
+
+    paths = []
+    file_hash = detection_cache.file_hash
+
+    def counting(path):
+        paths.append(path)
+        return file_hash(path)
+
+    monkeypatch.setattr(detection_cache, "file_hash", counting)
+    return paths
+
+
+def points_size(points: list[int]) -> int:
+    return len(json.dumps(points))
+
+
+def test_key_matches_content_key(cache, sources):
+    assert cache.key(sources, PARAMS, 5000) == detection_key(sources, PARAMS, 5000)
+    assert cache.key(sources, PARAMS, 5000) != cache.key(sources, PARAMS, 4000)
+
+
+def test_unchanged_sources_are_not_read_again(cache, sources, hashed):
+    key = cache.key(sources, PARAMS, 5000)
+    assert hashed == sources
+    hashed.clear()
+
+    assert cache.key(sources, PARAMS, 5000) == key
+    assert hashed == []
+
+
+def test_changed_sources_are_read_again(cache, sources, hashed):
+    key = cache.key(sources, PARAMS, 5000)
+    hashed.clear()
+    with open(sources[1], "ab") as fd:
+        fd.write(b"more")
+
+    assert cache.key(sources, PARAMS, 5000) != key
+    assert hashed == [sources[1]]
+    hashed.clear()
+    # a touched file is read again, and keeps its key when its content didn't move
+    with open(sources[1], "rb") as fd:
+        content = fd.read()
+    with open(sources[1], "wb") as fd:
+        fd.write(content)
+    stat = os.stat(sources[1])
+    os.utime(sources[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = cache.key(sources, PARAMS, 5000)
+    assert hashed == [sources[1]]
+    assert second == detection_key(sources, PARAMS, 5000)
+
+
+def test_least_recently_used_points_are_dropped(tmp_path):
+    points = [0, 5000, 10000]
+    cache = DetectionCache(str(tmp_path / "cache.sqlite"), size=2 * points_size(points))
+    cache.put("a", points)
+    cache.put("b", points)
+    # reading a makes b the oldest used entry
+    assert cache.get("a") == points
+    cache.put("c", points)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == points
+    assert cache.get("c") == points
+    cache.close()
+
+
+def test_entries_larger_than_the_cache_are_dropped(tmp_path):
+    cache = DetectionCache(str(tmp_path / "cache.sqlite"), size=4)
+    cache.put("a", [0, 5000, 10000])
+    assert cache.get("a") is None
+    cache.close()
+
+
+def test_least_recently_used_files_are_dropped(tmp_path, sources, hashed):
+    cache = DetectionCache(str(tmp_path / "cache.sqlite"), files=2)
+    for path in sources:
+        cache.key([path], PARAMS, 5000)
+    hashed.clear()
+
+    cache.key(sources[1:], PARAMS, 5000)
+    assert hashed == []
+    cache.key(sources[:1], PARAMS, 5000)
+    assert hashed == sources[:1]
+    cache.close()
+
+
+def test_shared_between_threads(cache, sources):
+    key = cache.key(sources, PARAMS, 5000)
+    cache.put(key, [0, 5000])
+    errors = []
+
+    def lookup(index: int):
+        try:
+            for split_height in range(20):
+                assert cache.key(sources, PARAMS, 5000) == key
+                assert cache.get(key) == [0, 5000]
+                own = cache.key(sources, PARAMS, index * 100 + split_height)
+                cache.put(own, [index, split_height])
+                assert cache.get(own) == [index, split_height]
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=lookup, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_shared_between_connections(cache):
+    cache.put("a", [0, 5000])
+    other = DetectionCache(cache.path)
+    assert other.get("a") == [0, 5000]
+    other.close()
@@ -0,0 +1,141 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import json
+import os
+
+import pytest
+
+from stitchtoon_gui.utils.manifest import MANIFEST_FILENAME
+from stitchtoon_gui.utils.manifest import Manifest
+from stitchtoon_gui.utils.manifest import profile_hash
+from stitchtoon_gui.utils.manifest import skip_unchanged
+from stitchtoon_gui.utils.pipeline import Chapter
+
+
+KWARGS = {"output": "", "skip_unchanged": True, "split_height": 5000}
+
+
+@pytest.fixture
+def chapter(tmp_path):
+    source = tmp_path / "input"
+    source.mkdir()
+    for name in ("01.png", "02.png"):
+        (source / name).write_bytes(name.encode() * 64)
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "01.png").write_bytes(b"slice")
+    return Chapter(
+        input=str(source),
+        output=str(output),
+        images=[],
+        format=".png",
+        sources=sorted(str(path) for path in source.iterdir()),
+    )
+
+
+def write_run(chapter, kwargs=KWARGS) -> dict[str, any]:
+    """Records the chapter as a run with kwargs would, returns the run kwargs"""
+
+    kwargs = {**kwargs, "output": chapter.output}
+    Manifest(chapter.output, profile_hash(kwargs)).record(chapter, ["01.png"])
+    return kwargs
+
+
+def skipped(chapter, kwargs) -> bool:
+    return not skip_unchanged(kwargs, [chapter])[1]
+
+
+def read_files(chapter) -> dict[str, list]:
+    with open(os.path.join(chapter.output, MANIFEST_FILENAME)) as fd:
+        return json.load(fd)["chapters"]["."]["files"]
+
+
+def touch(path, delta: int = 5_000_000_000) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + delta))
+
+
+def test_unchanged_chapter_is_skipped(chapter):
+    kwargs = write_run(chapter)
+    assert skipped(chapter, kwargs)
+    assert skipped(chapter, {**kwargs, "prefetch": 4, "encode_workers": 2})
+
+
+def test_off_keeps_every_chapter(chapter):
+    kwargs = write_run(chapter)
+    assert skip_unchanged({**kwargs, "skip_unchanged": False}, [chapter]) == (
+        None,
+        [chapter],
+    )
+
+
+def test_size_change_reruns(chapter):
+    kwargs = write_run(chapter)
+    with open(chapter.sources[0], "ab") as fd:
+        fd.write(b"more")
+    assert not skipped(chapter, kwargs)
+
+
+def test_content_change_with_same_size_reruns(chapter):
+    kwargs = write_run(chapter)
+    with open(chapter.sources[0], "r+b") as fd:
+        fd.write(b"XX")
+    touch(chapter.sources[0])
+    assert not skipped(chapter, kwargs)
+
+
+def test_mtime_only_change_refreshes_timestamp(chapter):
+    kwargs = write_run(chapter)
+    touch(chapter.sources[1])
+    before = read_files(chapter)["02.png"]
+
+    assert skipped(chapter, kwargs)
+    after = read_files(chapter)["02.png"]
+    assert after[0] == before[0] and after[2] == before[2]
+    assert after[1] == os.stat(chapter.sources[1]).st_mtime_ns != before[1]
+
+
+def test_profile_change_reruns(chapter):
+    kwargs = write_run(chapter)
+    assert not skipped(chapter, {**kwargs, "split_height": 4000})
+
+
+def test_added_or_removed_source_reruns(chapter):
+    kwargs = write_run(chapter)
+    added = os.path.join(chapter.input, "03.png")
+    with open(added, "wb") as fd:
+        fd.write(b"new")
+    chapter.sources.append(added)
+    assert not skipped(chapter, kwargs)
+    chapter.sources = chapter.sources[:1]
+    assert not skipped(chapter, kwargs)
+
+
+def test_deleted_output_reruns(chapter):
+    kwargs = write_run(chapter)
+    os.remove(os.path.join(chapter.output, "01.png"))
+    assert not skipped(chapter, kwargs)
+
+
+def test_archive_output_keeps_manifest_next_to_it(chapter, tmp_path):
+    chapter.output = str(tmp_path / "chapter.cbz")
+    with open(chapter.output, "wb") as fd:
+        fd.write(b"archive")
+    kwargs = {**KWARGS, "output": chapter.output}
+    manifest = Manifest(chapter.output, profile_hash(kwargs))
+    manifest.record(chapter, [])
+
+    assert manifest.path == str(tmp_path / MANIFEST_FILENAME)
+    with open(manifest.path) as fd:
+        assert "chapter.cbz" in json.load(fd)["chapters"]
+    assert skipped(chapter, kwargs)
+    os.remove(chapter.output)
+    assert not skipped(chapter, kwargs)
+
+
+def test_unreadable_manifest_is_ignored(chapter):
+    kwargs = write_run(chapter)
+    with open(os.path.join(chapter.output, MANIFEST_FILENAME), "w") as fd:
+        fd.write("{not json")
+    assert not skipped(chapter, kwargs)
@@ -0,0 +1,158 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import json
+
+import pytest
+
+from PySide6.QtCore import QSettings
+from stitchtoon_gui.utils.constants import DEFAULT_PROFILES
+from stitchtoon_gui.utils.profile_store import ProfileStore
+from stitchtoon_gui.utils.profile_store import read_profiles
+from stitchtoon_gui.utils.profile_store import write_profiles
+
+
+def make_profile(name: str, tags=()) -> dict[str, any]:
+    return {**next(iter(DEFAULT_PROFILES.values())), "name": name, "tags": list(tags)}
+
+
+@pytest.fixture
+def store():
+    store = ProfileStore()
+    store.put(make_profile("Manhwa Raws", ["korean", "Color"]))
+    store.put(make_profile("Manga 100%", ["japanese", "bw"]))
+    store.put(make_profile("Webtoon_Edit", ["korean", "edit"]))
+    yield store
+    store.close()
+
+
+def test_search_by_name(store):
+    assert store.search("man") == ["Manhwa Raws", "Manga 100%"]
+    assert store.search("  raws ") == ["Manhwa Raws"]
+
+
+def test_search_by_tag_prefix(store):
+    assert store.search("kor") == ["Manhwa Raws", "Webtoon_Edit"]
+    # tags are matched from their start only, and ignoring case
+    assert store.search("orean") == []
+    assert store.search("COLOR") == ["Manhwa Raws"]
+
+
+def test_search_escapes_like_wildcards(store):
+    assert store.search("%") == ["Manga 100%"]
+    assert store.search("_") == ["Webtoon_Edit"]
+    assert store.search("") == store.names()
+
+
+def test_put_replaces_tags_in_place(store):
+    store.put(make_profile("Manhwa Raws", ["done"]))
+
+    assert store.names() == ["Manhwa Raws", "Manga 100%", "Webtoon_Edit"]
+    assert store.search("kor") == ["Webtoon_Edit"]
+    assert store.search("done") == ["Manhwa Raws"]
+
+
+def test_delete_drops_tags(store):
+    store.delete("Manhwa Raws")
+
+    assert "Manhwa Raws" not in store
+    assert store.search("color") == []
+    with pytest.raises(KeyError):
+        store["Manhwa Raws"]
+
+
+def test_persists_bodies_and_order(tmp_path):
+    path = str(tmp_path / "profiles.sqlite3")
+    store = ProfileStore(path)
+    store.put(make_profile("b", ["x"]))
+    store.put(make_profile("a"))
+    store.close()
+
+    store = ProfileStore(path)
+    assert store.names() == ["b", "a"]
+    assert store["b"] == make_profile("b", ["x"])
+    assert store.search("x") == ["b"]
+    store.close()
+
+
+def test_export_import_round_trip(store, tmp_path):
+    path = tmp_path / "profiles.json"
+
+    write_profiles(path, store.values())
+    profiles = read_profiles(path)
+
+    assert [profile["name"] for profile in profiles] == store.names()
+    assert profiles == [store[name] for name in store.names()]
+    imported = ProfileStore()
+    for profile in profiles:
+        imported.put(profile)
+    assert imported.search("kor") == store.search("kor")
+    imported.close()
+
+
+def test_import_fills_missing_fields(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"name": "Partial", "lossyQuality": 42}))
+
+    (profile,) = read_profiles(path)
+
+    base = next(iter(DEFAULT_PROFILES.values()))
+    assert profile == {**base, "name": "Partial", "lossyQuality": 42}
+
+
+@pytest.mark.parametrize(
+    "data", [[{"lossyQuality": 1}], {"profiles": "x"}, "profiles", [["Name"]]]
+)
+def test_import_rejects_other_files(tmp_path, data):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps(data))
+
+    with pytest.raises(ValueError):
+        read_profiles(path)
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    from stitchtoon_gui.utils.settings import settings
+
+    monkeypatch.setattr(settings, "profiles", ProfileStore())
+    yield settings
+    settings.profiles.close()
+
+
+def write_legacy_profiles(settings, profiles: dict[str, any]):
+    """Writes profiles the way versions before the store kept them"""
+
+    legacy = QSettings(settings.fileName(), settings.format())
+    legacy.setValue("profiles", profiles)
+    legacy.sync()
+    QSettings.sync(settings)
+
+
+def test_migrates_legacy_profiles(settings):
+    profiles = {name: make_profile(name, ["old"]) for name in ("One", "Two")}
+    write_legacy_profiles(settings, profiles)
+
+    settings._migrate_profiles()
+
+    assert settings.profiles.names() == ["One", "Two"]
+    assert settings.profiles["Two"] == profiles["Two"]
+    assert settings.profiles.search("old") == ["One", "Two"]
+    assert not settings.contains("profiles")
+    assert not QSettings(settings.fileName(), settings.format()).contains("profiles")
+
+
+def test_migration_keeps_existing_store(settings):
+    settings.profiles.put(make_profile("Current"))
+    write_legacy_profiles(settings, {"Old": make_profile("Old")})
+
+    settings._migrate_profiles()
+
+    assert settings.profiles.names() == ["Current"]
+    assert not settings.contains("profiles")
+
+
+def test_migration_without_legacy_profiles(settings):
+    settings._migrate_profiles()
+
+    assert len(settings.profiles) == 0
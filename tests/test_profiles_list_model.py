@@ -0,0 +1,139 @@
+# This file is part of stitchtoon.
+# License: MIT, see the file "LICENSE" for details.
+
+import pytest
+
+from stitchtoon_gui.gui.profiles_list_model import ProfilesListModel
+from stitchtoon_gui.utils.constants import DEFAULT_PROFILES
+from stitchtoon_gui.utils.profile_store import ProfileStore
+
+
+def make_profile(name: str) -> dict[str, any]:
+    return {**next(iter(DEFAULT_PROFILES.values())), "name": name}
+
+
+def in_sync(model: ProfilesListModel) -> bool:
+    return (
+        model.names == model.store.names()
+        and model.rows == {name: row for row, name in enumerate(model.names)}
+        and model.rowCount() == len(model.names)
+    )
+
+
+def assert_in_sync(model: ProfilesListModel):
+    assert in_sync(model)
+    # errors raised in slots don't reach the test, they are recorded instead
+    assert all(model.checks)
+
+
+@pytest.fixture
+def model():
+    store = ProfileStore()
+    for name in ("a", "b", "c"):
+        store.put(make_profile(name))
+    model = ProfilesListModel(store)
+    # model must be in sync again by the time end*Rows emits
+    model.checks = []
+    model.rowsInserted.connect(lambda *args: model.checks.append(in_sync(model)))
+    model.rowsRemoved.connect(lambda *args: model.checks.append(in_sync(model)))
+    model.modelReset.connect(lambda: model.checks.append(in_sync(model)))
+    yield model
+    store.close()
+
+
+@pytest.fixture
+def ranges(model):
+    """Records (signal, first, last) of rows about to be inserted or removed"""
+
+    ranges = []
+    model.rowsAboutToBeInserted.connect(
+        lambda parent, first, last: ranges.append(("insert", first, last))
+    )
+    model.rowsAboutToBeRemoved.connect(
+        lambda parent, first, last: ranges.append(("remove", first, last))
+    )
+    return ranges
+
+
+def test_starts_in_sync(model):
+    assert model.names == ["a", "b", "c"]
+    assert_in_sync(model)
+
+
+def test_add_appends_row(model, ranges):
+    model.addProfile(make_profile("d"))
+
+    assert ranges == [("insert", 3, 3)]
+    assert model.names[-1] == "d"
+    assert model.getProfileIndex("d").row() == 3
+    assert_in_sync(model)
+
+
+def test_add_existing_updates_in_place(model, ranges):
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append(first.row()))
+    profile = {**make_profile("b"), "lossyQuality": 10}
+
+    model.addProfile(profile)
+
+    assert ranges == []
+    assert changed == [1]
+    assert model.store["b"]["lossyQuality"] == 10
+    assert_in_sync(model)
+
+
+@pytest.mark.parametrize("row", [0, 1, 2])
+def test_delete_reindexes_following_rows(model, ranges, row):
+    name = model.names[row]
+
+    model.deleteProfile(model.index(row, 0))
+
+    assert ranges == [("remove", row, row)]
+    assert name not in model.rows
+    assert not model.getProfileIndex(name).isValid()
+    assert_in_sync(model)
+
+
+def test_delete_invalid_index_does_nothing(model, ranges):
+    model.deleteProfile(model.index(5, 0))
+
+    assert ranges == []
+    assert_in_sync(model)
+
+
+def test_rename(model, ranges):
+    # the settings tab renames by saving under the new name, then deleting
+    model.addProfile(make_profile("renamed"))
+    model.deleteProfile(model.getProfileIndex("a"))
+
+    assert ranges == [("insert", 3, 3), ("remove", 0, 0)]
+    assert model.names == ["b", "c", "renamed"]
+    assert_in_sync(model)
+
+
+def test_reload_after_store_changes(model):
+    model.store.delete("b")
+    model.store.put(make_profile("e"))
+
+    model.reload()
+
+    assert model.names == ["a", "c", "e"]
+    assert_in_sync(model)
+
+
+def test_mixed_mutations(model, ranges):
+    model.addProfile(make_profile("d"))
+    model.deleteProfile(model.getProfileIndex("b"))
+    model.addProfile(make_profile("e"))
+    model.deleteProfile(model.getProfileIndex("e"))
+    model.deleteProfile(model.getProfileIndex("a"))
+
+    assert ranges == [
+        ("insert", 3, 3),
+        ("remove", 1, 1),
+        ("insert", 3, 3),
+        ("remove", 3, 3),
+        ("remove", 0, 0),
+    ]
+    assert model.names == ["c", "d"]
+    assert_in_sync(model)